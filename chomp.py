@@ -20,29 +20,53 @@ import pygame as pg
 import random, time
 from copy import deepcopy
 from chomp_util import BoardFunctions, GUI, Player
+from chomp_book import OpeningBook, BOOK_FILE
 
 # Board + 2 Players + GUI + Game Rules
 class Game:
     # initialize the game
-    def __init__(self, strat1, strat2, screenOn, boardType):
+    # quiet: play without the GUI and without printing anything
+    def __init__(self, strat1, strat2, screenOn, boardType, \
+                 bookFile=BOOK_FILE, quiet=False):
         # initial board instance
         self.B = BoardFunctions(boardType)
         self.mainboard = self.B.makeBoard(boardType)
+
+        # opening book of winning replies (None if it wasn't built;
+        # build it with 'python chomp_book.py build')
+        self.book = OpeningBook.load(bookFile)
         
         # player setup
         self.P1 = Player(1, strat1)
         self.P2 = Player(2, strat2)
         self.turn = 1 # Begin with Player 1
 
+        # game results
+        self.winner = 0
+        self.moves = 0 # number of moves played
+        self.moveTimes = {1: [], 2: []} # seconds spent on each move
+
         # screen setup
-        self.Gui = GUI(self.B, strat1, strat2, screenOn)
+        self.quiet = quiet
+        if quiet: self.Gui = None
+        else:     self.Gui = GUI(self.B, strat1, strat2, screenOn)
+
+    # print a message, unless the game is quiet
+    def say(self, message):
+        if not self.quiet:
+            print(message)
+
+    # draw or print the board, unless the game is quiet
+    def showBoard(self):
+        if self.quiet:          return
+        elif self.Gui.screenOn: self.Gui.drawBoard(self.mainboard)
+        else:                   self.Gui.printBoard(self.mainboard)
 
     # welcome the player to the game
     def welcome(self):
-        print("Welcome to Chomp!")
-        print("Initial board: %d by %d" % (self.B.width, self.B.height))
-        if self.Gui.screenOn: self.Gui.drawBoard(self.mainboard)
-        else:                 self.Gui.printBoard(self.mainboard)
+        self.say("Welcome to Chomp!")
+        self.say("Initial board: %d by %d" % (self.B.width, self.B.height))
+        self.showBoard()
     
     # change turns (done simply with binary XOR)
     def changeTurn(self):
@@ -52,35 +76,38 @@ class Game:
     def getMove(self):
         while(True):
             # prompt player
-            print("Player %d, choose a coordinate to remove" % self.turn)
+            self.say("Player %d, choose a coordinate to remove" % self.turn)
             
             # get turn player's move
             mainboard = self.B.copyBoard(self.mainboard)
+            start = time.perf_counter()
             if self.turn == 1:
                 square = self.P1.PlayerStrategy(self, mainboard)
             elif self.turn == 2:
                 square = self.P2.PlayerStrategy(self, mainboard)
+            self.moveTimes[self.turn].append(time.perf_counter() - start)
 
             # check if legal move
             if self.B.isValidMove(self.mainboard, square):
                 return square
             else:
-                print("Invalid square coordinates")
+                self.say("Invalid square coordinates")
     
     # play a single person's turn
     def playTurn(self):
         # get the player's square and update board
         square = self.getMove()
-        print("Player %d took away %s" % (self.turn, str(square)))
+        self.say("Player %d took away %s" % (self.turn, str(square)))
         self.mainboard = self.B.updateBoard(self.mainboard, square)
+        self.moves += 1
 
         # print the board, then check if game is over
-        if self.Gui.screenOn: self.Gui.drawBoard(self.mainboard)
-        else:                 self.Gui.printBoard(self.mainboard)
+        self.showBoard()
         
         if self.B.gameIsOver(self.mainboard):
-            print("Player %d is the winner!" % self.turn)
-            if self.Gui.screenOn:
+            self.winner = self.turn
+            self.say("Player %d is the winner!" % self.turn)
+            if not self.quiet and self.Gui.screenOn:
                 time.sleep(3) # give player time to see result
         
         # change turn
@@ -89,8 +116,14 @@ class Game:
     # play the entire game
     def play(self):
         self.welcome()
-        while not self.B.gameIsOver(self.mainboard):
-            self.playTurn()
+        try:
+            while not self.B.gameIsOver(self.mainboard):
+                self.playTurn()
+        finally:
+            # done w/ the opening book; unmap it
+            if self.book:
+                self.book.close()
+                self.book = None
 
 
 ##### Custom Boards #####
@@ -186,6 +219,8 @@ def main():
     # - r: RandomStrat (any Random move)
     # - g: GreedyStrat (remove as many squares as possible (be Greedy!),
     #       but also put foe in a losing position if possible)
+    # - m: MCTSStrat (Monte Carlo Tree Search: play lots of random
+    #       games and pick the move that wins the most)
     # - a1: AIStrat1 (for Team 1 to make!)
     # - a2: AIStrat2 (for Team 2 to make!)
     # screenOn:
@@ -0,0 +1,342 @@
+'''
+This Chomp opening book was created for the purposes of Project
+Ignite 2021: AI-m of the Game. Please do not redistribute publicly
+without permission.
+
+The opening book stores winning replies for every position within N
+plies of the standard rectangles, so that the same games don't have to
+be searched again every time they're played.
+
+Every position that can be reached from a rectangle is a "staircase"
+(each row is a prefix of the row below it), so it can be written down
+as the tuple of its row widths, from the bottom row to the top row:
+        1
+    Eg. 1 1 1     is (4,3,1)
+        1 1 1 1
+Chomp doesn't change if we flip the board along its diagonal, so a
+position and its transpose share a single entry in the book.
+
+Book file format (all sizes in bytes):
+    header:  8 magic (b'CHOMPBK1') + 4 number of records (little endian)
+    records: 16 key (big endian) + 1 x + 1 y, sorted by key
+The file is memory-mapped and looked up with a binary search, so the
+book is never read into memory all at once.
+
+Limitation: a position is only solved if every staircase inside it fits
+in the budget (DEFAULT_BUDGET = 50000 positions), and the solver is
+exact, so big rectangles can't be solved near their start. The default
+20x15 game has C(35,15) = 3,247,943,160 staircases: neither its opening
+position nor any real opening reply can be solved, so the book can't
+cover 20x15 openings and 20x15 isn't one of the standard rectangles
+(20x15 games only use the book once they reach a position that's in
+it). 10x10 is about half covered, and 8x8 and 7x5 are fully covered.
+The build prints how much of each rectangle it covered.
+
+Build the book with:
+    python chomp_book.py build [--plies N] [--rect WxH ...] [--out FILE]
+'''
+
+import argparse, mmap, os, struct, sys, time
+from chomp_util import QUADWORD, line, msb
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'chomp_book.bin')
+BOOK_MAGIC = b'CHOMPBK1'
+HEADER = struct.Struct('<8sI')
+RECORD = struct.Struct('>16sBB')
+KEY_BYTES = 16 # keys are at most 128 bits
+
+# rectangles the book is built for by default (see above for 20x15)
+STANDARD_RECTANGLES = [(10,10), (8,8), (7,5)]
+DEFAULT_PLIES = 2
+DEFAULT_BUDGET = 50000 # max positions searched per book entry
+
+##### Staircase Positions #####
+
+# bitboard (see BoardFunctions) to staircase row widths,
+# or None if the board isn't a staircase
+def boardToRows(board):
+    rows = []
+    for h in range(len(board)-1, -1, -1): # bottom row first
+        row = board[h]
+        if row == 0:
+            break
+        w = QUADWORD - msb(row & -row)
+        # row must be w squares starting from x=1, and no wider
+        # than the row below it
+        if row != line ^ ((1<<(QUADWORD-w)) - 1):
+            return None
+        if rows and w > rows[-1]:
+            return None
+        rows.append(w)
+    # every row above the staircase must be empty
+    for h in range(len(board)-len(rows)):
+        if board[h]:
+            return None
+    return tuple(rows)
+
+# flip the staircase along its diagonal
+# Eg. (4,3,1) --> (3,2,2,1)
+def transpose(rows):
+    return tuple(sum(1 for r in rows if r > x) for x in range(rows[0]))
+
+# return the smaller of rows and its transpose, and whether it was flipped
+def canonical(rows):
+    flipped = transpose(rows)
+    if flipped < rows:
+        return flipped, True
+    return rows, False
+
+# take square (x,y) away from the staircase
+def chompRows(rows, square):
+    x, y = square
+    newRows = rows[:y-1] + tuple(min(r, x-1) for r in rows[y-1:])
+    return tuple(r for r in newRows if r)
+
+# list of all (x,y) squares that can be taken from the staircase
+def rowMoves(rows):
+    moves = []
+    for y in range(1, len(rows)+1):
+        for x in range(1, rows[y-1]+1):
+            if x != 1 or y != 1:
+                moves.append((x,y))
+    return moves
+
+# encode the staircase's outline as an integer: walking down from the
+# top-left corner, a 1 for every step right and a 0 for every step down,
+# after a leading 1 so that outlines of different lengths don't collide
+# Eg. (2,1) --> 1 10 10 --> 0b11010
+def encodeRows(rows):
+    key = 1
+    prev = 0
+    for w in reversed(rows): # top row first
+        step = w - prev
+        key = (key << (step+1)) | (((1<<step) - 1) << 1)
+        prev = w
+    return key
+
+# number of staircases that fit inside rows (including rows itself
+# and the empty board), ie. how many positions solving rows may visit
+def countSubRows(rows):
+    # ways[w] = number of ways to fill the rows so far, ending in width w
+    ways = [1] * (rows[0]+1)
+    for r in rows[1:]:
+        # a row can't be wider than the row below it
+        newWays = [0] * (rows[0]+1)
+        total = 0
+        for w in range(rows[0], -1, -1):
+            total += ways[w]
+            if w <= r:
+                newWays[w] = total
+        ways = newWays
+    return sum(ways)
+
+# book key of the staircase, or None if it doesn't fit in a key
+def rowsKey(rows):
+    if rows[0] + len(rows) >= 8*KEY_BYTES:
+        return None
+    return encodeRows(rows).to_bytes(KEY_BYTES, 'big')
+
+
+##### Solver #####
+
+class BudgetExceeded(Exception):
+    pass
+
+# solve staircases exactly. Results are kept in a cache that is
+# shared by every position, so nearby positions get cheaper
+class Solver:
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self.nodes = 0
+        # canonical rows -> winning move (in canonical rows), or
+        # None if the player to move loses
+        self.cache = {}
+
+    # well-known P-positions that don't need any searching, or None
+    # if the position isn't one of the known families
+    def knownLoss(self, rows):
+        if len(rows) == 1: # single row: only (1,) is lost
+            return rows[0] == 1
+        if len(rows) == 2: # two rows: lost iff top row is 1 shorter
+            return rows[1] == rows[0]-1
+        if rows[1] == 1: # L with thickness 1: lost iff both arms equal
+            return rows[0] == len(rows)
+        return None
+
+    # return a winning (x,y) for the player to move, or None if the
+    # position is lost. Raise BudgetExceeded if it takes too long
+    def winningMove(self, rows):
+        canon, flipped = canonical(rows)
+        if canon in self.cache:
+            move = self.cache[canon]
+        else:
+            move = self.solve(canon)
+        if move and flipped:
+            return (move[1], move[0])
+        return move
+
+    def solve(self, rows):
+        if self.knownLoss(rows):
+            self.cache[rows] = None
+            return None
+
+        self.nodes += 1
+        if self.nodes > self.budget:
+            raise BudgetExceeded()
+
+        # try the moves that leave the fewest squares first
+        best = None
+        for move in reversed(rowMoves(rows)):
+            if self.winningMove(chompRows(rows, move)) is None:
+                best = move
+                break
+        self.cache[rows] = best
+        return best
+
+    # solve rows within this Solver's budget; None if it's lost
+    # and False if it couldn't be solved in time
+    def tryWinningMove(self, rows):
+        self.nodes = 0
+        try:
+            return self.winningMove(rows)
+        except BudgetExceeded:
+            return False
+
+
+##### Building and Reading #####
+
+# all canonical staircases reachable within 'plies' moves of a rectangle
+def positionsNear(width, height, plies):
+    start, _ = canonical(tuple([width]*height))
+    seen = {start}
+    frontier = [start]
+    for _ in range(plies):
+        nextFrontier = []
+        for rows in frontier:
+            for move in rowMoves(rows):
+                child, _ = canonical(chompRows(rows, move))
+                if child not in seen:
+                    seen.add(child)
+                    nextFrontier.append(child)
+        frontier = nextFrontier
+    return seen
+
+# solve all positions near the rectangles, and write the winning ones
+def buildBook(path, rectangles, plies, budget=DEFAULT_BUDGET):
+    solver = Solver(budget)
+    entries = {}
+    skipped = 0
+    for (width, height) in rectangles:
+        start = time.time()
+        positions = positionsNear(width, height, plies)
+        tooBig = unsolved = 0
+        # solve smaller positions first to warm up the cache
+        for rows in sorted(positions, key=sum):
+            key = rowsKey(rows)
+            if key is None or key in entries:
+                continue
+            if countSubRows(rows) > budget: # hopeless; don't even try
+                tooBig += 1
+                continue
+            move = solver.tryWinningMove(rows)
+            if move is False:
+                unsolved += 1
+            elif move:
+                entries[key] = move
+        skipped += tooBig + unsolved
+        print("%dx%d: %d positions within %d plies, %d too big for the " \
+            "budget, %d unsolved (%.1fs)" % (width, height, \
+            len(positions), plies, tooBig, unsolved, time.time()-start))
+        if countSubRows(tuple([width]*height)) > budget:
+            print("  warning: the %dx%d start position is too big for " \
+                "the budget, so its openings aren't in the book" \
+                % (width, height))
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(BOOK_MAGIC, len(entries)))
+        for key in sorted(entries):
+            x, y = entries[key]
+            f.write(RECORD.pack(key, x, y))
+    print("Wrote %d winning replies to %s (%d positions unsolved)" \
+        % (len(entries), path, skipped))
+
+class OpeningBook:
+    def __init__(self, f):
+        self.file = f
+        self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != BOOK_MAGIC:
+            raise ValueError("Not a Chomp opening book")
+
+    # open the book at path, or return None if there is no book
+    @classmethod
+    def load(cls, path=BOOK_FILE):
+        if not path or not os.path.exists(path):
+            return None
+        return cls(open(path, 'rb'))
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    # binary search for the key; return the stored (x,y) or None
+    def find(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo+hi) // 2
+            offset = HEADER.size + mid*RECORD.size
+            midKey = self.data[offset:offset+KEY_BYTES]
+            if midKey < key:
+                lo = mid+1
+            elif midKey > key:
+                hi = mid
+            else:
+                _, x, y = RECORD.unpack_from(self.data, offset)
+                return (x, y)
+        return None
+
+    # return a winning (x,y) square for the board, or None if the
+    # book doesn't know one
+    def lookup(self, board, B):
+        rows = boardToRows(board)
+        if not rows or rows == (1,):
+            return None
+        canon, flipped = canonical(rows)
+        key = rowsKey(canon)
+        if key is None:
+            return None
+        move = self.find(key)
+        if move is None:
+            return None
+        if flipped:
+            move = (move[1], move[0])
+        if not B.isValidMove(board, move):
+            return None
+        return move
+
+
+##### Main Function #####
+def parseRect(text):
+    width, height = text.lower().split('x')
+    return (int(width), int(height))
+
+def main():
+    parser = argparse.ArgumentParser(description="Chomp opening book")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="build the opening book")
+    build.add_argument('--out', default=BOOK_FILE)
+    build.add_argument('--plies', type=int, default=DEFAULT_PLIES)
+    build.add_argument('--rect', type=parseRect, action='append',
+                       help="rectangle WxH (default: standard ones)")
+    build.add_argument('--budget', type=int, default=DEFAULT_BUDGET,
+                       help="max positions searched per book entry")
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(10000)
+    if args.command == 'build':
+        buildBook(args.out, args.rect or STANDARD_RECTANGLES,
+                  args.plies, args.budget)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+'''
+This Chomp match runner was created for the purposes of Project
+Ignite 2021: AI-m of the Game. Please do not redistribute publicly
+without permission.
+
+Play many headless Chomp games between two strategies (no GUI, no
+printing), spread over several worker processes, then report each
+strategy's win rate, the average game length and the average time
+each strategy took per move.
+
+Eg. python chomp_runner.py g r --games 1000 --board 20x15 --alternate
+'''
+
+import argparse, multiprocessing, os, random, time
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1') # stay quiet
+from chomp import Game
+from chomp_book import BOOK_FILE
+
+# strategies that need a human can't be run headless
+HUMAN_STRATS = ['c', 's']
+
+# play the given games in this worker; each game is (seed, swapped),
+# where swapped games let strategy 2 move first.
+# return [wins, moves, time spent] for each strategy, and total moves
+def playGames(strat1, strat2, boardType, bookFile, games):
+    results = [[0, 0, 0.0], [0, 0, 0.0]]
+    totalMoves = 0
+    for (seed, swapped) in games:
+        random.seed(seed)
+        if swapped:
+            G = Game(strat2, strat1, False, boardType, bookFile, quiet=True)
+        else:
+            G = Game(strat1, strat2, False, boardType, bookFile, quiet=True)
+        G.play()
+
+        # map Player 1/2 back to strategy 1/2
+        for turn in [1, 2]:
+            side = (turn-1) ^ swapped
+            results[side][0] += G.winner == turn
+            results[side][1] += len(G.moveTimes[turn])
+            results[side][2] += sum(G.moveTimes[turn])
+        totalMoves += G.moves
+    return results, totalMoves
+
+# play 'numGames' games on 'workers' processes and return the summary
+def runMatch(strat1, strat2, boardType, numGames, workers=None, \
+             alternate=False, seed=0, bookFile=BOOK_FILE):
+    for strat in [strat1, strat2]:
+        if strat in HUMAN_STRATS:
+            raise ValueError("'%s' needs a human and can't run headless" \
+                % strat)
+
+    if numGames < 1:
+        raise ValueError("need at least 1 game")
+
+    # no more workers than games
+    workers = min(workers or multiprocessing.cpu_count(), numGames)
+    games = [(seed+i, alternate and i%2 == 1) for i in range(numGames)]
+    chunks = [games[i::workers] for i in range(workers)]
+    chunks = [chunk for chunk in chunks if chunk]
+
+    start = time.perf_counter()
+    args = [(strat1, strat2, boardType, bookFile, chunk) for chunk in chunks]
+    with multiprocessing.Pool(len(chunks)) as pool:
+        outputs = pool.starmap(playGames, args)
+    elapsed = time.perf_counter() - start
+
+    # add up the results of every worker
+    results = [[0, 0, 0.0], [0, 0, 0.0]]
+    totalMoves = 0
+    for (workerResults, workerMoves) in outputs:
+        for side in [0, 1]:
+            for i in range(3):
+                results[side][i] += workerResults[side][i]
+        totalMoves += workerMoves
+
+    summary = {
+        'games': numGames,
+        'seconds': elapsed,
+        'avgGameLength': totalMoves / numGames if numGames else 0,
+        'strategies': [],
+    }
+    for side, strat in enumerate([strat1, strat2]):
+        wins, moves, spent = results[side]
+        summary['strategies'].append({
+            'strat': strat,
+            'wins': wins,
+            'winRate': wins / numGames if numGames else 0,
+            'moves': moves,
+            'avgMoveMs': 1000 * spent / moves if moves else 0,
+        })
+    return summary
+
+def printSummary(summary, boardType):
+    print("%d games on %s in %.1fs" % (summary['games'], \
+        str(boardType), summary['seconds']))
+    print("Average game length: %.1f moves" % summary['avgGameLength'])
+    for i, stats in enumerate(summary['strategies']):
+        print("Strategy %d (%s): %d wins (%.1f%%), %.3f ms/move" % (i+1, \
+            stats['strat'], stats['wins'], 100*stats['winRate'], \
+            stats['avgMoveMs']))
+
+
+##### Main Function #####
+def positiveInt(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return value
+
+def parseBoard(text):
+    width, height = text.lower().split('x')
+    return (int(width), int(height))
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Chomp matches")
+    parser.add_argument('strat1', help="strategy code of strategy 1")
+    parser.add_argument('strat2', help="strategy code of strategy 2")
+    parser.add_argument('--games', type=positiveInt, default=100)
+    parser.add_argument('--board', type=parseBoard, default=(20,15),
+                        help="rectangle WxH (default: 20x15)")
+    parser.add_argument('--workers', type=positiveInt, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument('--alternate', action='store_true',
+                        help="swap who moves first every other game")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--book', default=BOOK_FILE)
+    args = parser.parse_args()
+
+    summary = runMatch(args.strat1.lower(), args.strat2.lower(), \
+        args.board, args.games, args.workers, args.alternate, \
+        args.seed, args.book)
+    printSummary(summary, args.board)
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,9 @@ This helper file contains the classes for Board, GUI, and Player.
 '''
 
 import pygame as pg
-import random
+import math, random, time
 from copy import deepcopy
+from mcts_util import UCTNode
 
 HALFWORD = 16 # 2 bytes
 WORD = 32 # 4 bytes
@@ -31,6 +32,158 @@ def countSetBits(n):
         count+= 1
     return count
 
+# NumPy versions of the bitboard constants, for vectorized boards.
+# NumPy is only needed by the vectorized helpers, so loadNumpy() imports
+# it (and builds these) the first time one of them is used
+np = None
+np_line = np_one = col_shifts = left_lines = byte_counts = None
+def loadNumpy():
+    global np, np_line, np_one, col_shifts, left_lines, byte_counts
+    if np is not None:
+        return
+    import numpy
+    np_line = numpy.uint64(line)
+    np_one = numpy.uint64(one)
+    # shift to move column [y] of a row to the last bit
+    col_shifts = numpy.arange(QUADWORD-1, -1, -1, dtype=numpy.uint64)
+    # left_lines[y] keeps columns [0] to [y-1] of a row: 1110000...
+    left_lines = numpy.array([line ^ ((1<<(QUADWORD-y)) - 1) \
+                              for y in range(QUADWORD)], dtype=numpy.uint64)
+    # number of set bits in each byte
+    byte_counts = numpy.array([countSetBits(n) for n in range(256)], \
+                              dtype=numpy.int64)
+    np = numpy
+
+# Board
+# a list of row words (see BoardFunctions) that also remembers info
+# derived from its rows: max width, max height, which columns are
+# used and how many squares are left. Each one is computed the first
+# time it's needed and forgotten whenever the rows change (every list
+# method that changes the rows forgets it, see below)
+class Board(list):
+    __slots__ = ('_maxWidth', '_maxHeight', '_colMask', '_count')
+
+    def __init__(self, rows=()):
+        list.__init__(self, rows)
+        self.forget()
+
+    # forget all derived info
+    def forget(self):
+        self._maxWidth = None
+        self._maxHeight = None
+        self._colMask = None
+        self._count = None
+
+    # return an identical board, along with the derived info
+    def copy(self):
+        board2 = Board(self)
+        board2._maxWidth = self._maxWidth
+        board2._maxHeight = self._maxHeight
+        board2._colMask = self._colMask
+        board2._count = self._count
+        return board2
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy() # rows are ints, so nothing else to copy
+
+    # all rows OR'd together: 1 at every column w/ at least 1 square
+    def getColMask(self):
+        if self._colMask is None:
+            mask = 0
+            for row in self:
+                mask |= row
+            self._colMask = mask
+        return self._colMask
+
+    # width of longest row (see BoardFunctions.getMaxWidth)
+    def getMaxWidth(self):
+        if self._maxWidth is None:
+            mask = self.getColMask()
+            minbit = mask & -mask if mask else one # 0010000...
+            self._maxWidth = QUADWORD - msb(minbit)
+        return self._maxWidth
+
+    # height of tallest column (see BoardFunctions.getMaxHeight)
+    def getMaxHeight(self):
+        if self._maxHeight is None:
+            self._maxHeight = 0
+            for y in range(len(self)): # go down the board
+                if self[y]:
+                    self._maxHeight = len(self)-y
+                    break
+        return self._maxHeight
+
+    # number of squares left
+    def getCount(self):
+        if self._count is None:
+            self._count = sum(countSetBits(row) for row in self)
+        return self._count
+
+    # return new board after removing the square at [xpos][ypos] and
+    # the squares above/right. Whatever the parent already knows is
+    # passed on to the child without rescanning its rows
+    def chomp(self, xpos, ypos):
+        rightline = (1<<(QUADWORD-ypos)) - 1 # 0001111...
+        leftline = line ^ rightline # 1110000...
+
+        # for rows above and at current row
+        rows = self[:]
+        removed = 0
+        top = None # first row from the top that isn't empty
+        for h in range(xpos+1):
+            if rows[h] & rightline:
+                if self._count is not None:
+                    removed += countSetBits(rows[h] & rightline)
+                rows[h] &= leftline
+            if top is None and rows[h]:
+                top = h
+        board2 = Board(rows)
+
+        if self._count is not None:
+            board2._count = self._count - removed
+        if top is not None:
+            board2._maxHeight = len(self) - top
+        elif self._maxHeight is not None and \
+                len(self) - self._maxHeight > xpos:
+            board2._maxHeight = self._maxHeight # tallest column untouched
+        if self._colMask is not None:
+            if self._colMask & rightline == 0: # nothing removed
+                board2._colMask = self._colMask
+                board2._maxWidth = self._maxWidth
+            else:
+                # columns left of ypos are untouched; the others can only
+                # still be used by the rows below xpos
+                below = 0
+                for h in range(xpos+1, len(self)):
+                    below |= rows[h]
+                board2._colMask = (self._colMask & leftline) | \
+                    (below & rightline)
+        return board2
+
+# make a list method that changes the rows also forget the derived info
+def forgetsAfter(method):
+    def change(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self.forget()
+        return result
+    change.__name__ = method.__name__
+    return change
+
+for name in ['__setitem__', '__delitem__', '__iadd__', '__imul__', \
+             'append', 'extend', 'insert', 'pop', 'remove', 'clear', \
+             'sort', 'reverse']:
+    setattr(Board, name, forgetsAfter(getattr(list, name)))
+
+# wrap a list of row words in a Board, if it isn't one already
+def toBoard(board):
+    if isinstance(board, Board):
+        return board
+    return Board(board)
+
+
 # Board functions
 # creates and performs functions on board arrays
 class BoardFunctions:
@@ -75,11 +228,13 @@ class BoardFunctions:
             row = line ^ ((1<<(QUADWORD-self.width)) - 1)
             board = [row for h in range(self.height)]
             
-        return board
+        return Board(board)
 
     # return an identical board
     def copyBoard(self, board):
-        return deepcopy(board)
+        if isinstance(board, Board):
+            return board.copy()
+        return Board(board)
 
     ##### Conversions #####
 
@@ -164,12 +319,7 @@ class BoardFunctions:
     # Eg. 1 1   1   returns 4
     #     1
     def getMaxWidth(self, board):
-        minbit = one
-        for row in board:
-            if row:
-                lastbit = row & -row # 0010000...
-                minbit = min(minbit, lastbit)
-        return QUADWORD - msb(minbit)
+        return toBoard(board).getMaxWidth()
 
     # returns height of tallest column
     #     1 
@@ -177,10 +327,7 @@ class BoardFunctions:
     # Eg.   1 1 1   returns 4
     #     1     1
     def getMaxHeight(self, board):
-        for y in range(self.height): # go down the board
-            if board[y]:
-                return self.height-y
-        return 0
+        return toBoard(board).getMaxHeight()
 
     # if board is rectangle, return widthxheight of the rectangle
     # else return None
@@ -232,14 +379,11 @@ class BoardFunctions:
 
     # get a new board representing the differences b/w 2 boards
     def getDifferences(self, board1, board2):
-        differences = deepcopy(board1)
-        for y in range(self.height):
-            differences[y] = board1[y] ^ board2[y]
-        return differences
+        return Board(board1[y] ^ board2[y] for y in range(self.height))
 
     # check if game is over
     def gameIsOver(self, board):
-        for h in range(1, self.height-1):
+        for h in range(self.height-1):
             if board[h] != 0:
                 return False
         return board[self.height-1] == one
@@ -261,7 +405,8 @@ class BoardFunctions:
     # get list of rows w/ at least 1 square
     def getValidRows(self, board):
         valid = []
-        maxh = self.getMaxHeight(board)
+        board = toBoard(board)
+        maxh = board.getMaxHeight()
         #for y in range(height-maxh, height):
         for y in range(1,maxh+1):
             if board[self.height-y] != 0:
@@ -271,11 +416,9 @@ class BoardFunctions:
     # get list of columns w/ at least 1 square
     def getValidCols(self, board):
         valid = []
-        height = self.height
-        maxh, maxw = self.getMaxHeight(board), self.getMaxWidth(board)
-        allCols = 0
-        for y in range(height-maxh, height):
-            allCols |= board[y]
+        board = toBoard(board)
+        maxw = board.getMaxWidth()
+        allCols = board.getColMask()
         
         # allCols (in binary) will have a 1 at a valid columns
         cursor = one
@@ -287,37 +430,77 @@ class BoardFunctions:
 
     # get list of all valid square positions on board
     def getValidMoves(self, board):
-        valid = []
-        # cut computation by looking at smaller range
-        maxh, maxw = self.getMaxHeight(board), self.getMaxWidth(board)
+        return list(self.iterValidMoves(board))
 
+    # generate all valid squares by jumping from set bit to set bit
+    # of each row (bottom row first, then left to right)
+    def iterValidMoves(self, board):
+        # cut computation by looking at smaller range
+        maxh = toBoard(board).getMaxHeight()
         for y in range(1,maxh+1):
-            for x in range(1,maxw+1):
-                if x==1 and y==1:
-                    continue
-                if self.getValue(board, (x,y)):
-                    valid.append((x,y))
-        return valid
+            row = board[self.height-y]
+            if y == 1:
+                row &= ~one # (1,1) can't be taken
+            while row:
+                top = msb(row)
+                yield (QUADWORD-top, y)
+                row ^= 1<<top
 
     # count number of valid moves/squares left
     def countValidMoves(self, board):
-        count = 0
-        maxh = self.getMaxHeight(board)
-        for y in range(self.height-maxh, self.height):
-            count += countSetBits(board[y])
-        return count
+        return toBoard(board).getCount()
     
     # return new board after removing the square and the
     # squares above/right. This doesn't depend on the current player
     def updateBoard(self, board, square):
         xpos, ypos = self.squareToPos(square)
-        board2 = self.copyBoard(board)
-        rightline = (1<<(QUADWORD-ypos)) - 1 # 0001111...
-        leftline = line ^ rightline # 1110000...
-        # for rows above and at current row
-        for h in range(xpos+1):
-            board2[h] &= leftline
-        return board2
+        return toBoard(board).chomp(xpos, ypos)
+
+    ##### Vectorized Positions (NumPy) #####
+    # a board can also be a NumPy uint64 array of row words, and a
+    # batch of boards is a 2D array w/ one board per row. These need
+    # NumPy; nothing else in Chomp does
+
+    # board to NumPy uint64 array
+    def toArray(self, board):
+        loadNumpy()
+        return np.array(board, dtype=np.uint64)
+
+    # NumPy uint64 array back to a board
+    def fromArray(self, array):
+        return Board(int(row) for row in array)
+
+    # get every child of the board at once, as (moves, children):
+    # moves[i] is the (x,y) square taken and children[i] is the board
+    # after taking it. Moves are ordered from the top-left square, row
+    # by row, not like getValidMoves
+    def getChildren(self, board):
+        loadNumpy()
+        rows = np.asarray(board, dtype=np.uint64)
+        # squares[xpos][ypos] = value at [xpos][ypos] of the board
+        squares = (rows[:,None] >> col_shifts[None,:self.width]) \
+            & np.uint64(1)
+        squares[self.height-1, 0] = 0 # (1,1) can't be taken
+        xpos, ypos = np.nonzero(squares)
+
+        # child i keeps only the left part of the rows at and above xpos[i]
+        above = np.arange(self.height)[None,:] <= xpos[:,None]
+        masks = np.where(above, left_lines[ypos][:,None], np_line)
+        children = rows[None,:] & masks
+
+        moves = np.stack([ypos + 1, self.height - xpos], axis=1)
+        return moves, children
+
+    # gameIsOver for every board in the batch
+    def gamesAreOver(self, boards):
+        loadNumpy()
+        return (boards[:,:-1] == 0).all(axis=1) & (boards[:,-1] == np_one)
+
+    # countValidMoves for every board in the batch
+    def countBoards(self, boards):
+        loadNumpy()
+        bytes_ = boards.reshape(len(boards), -1).view(np.uint8)
+        return byte_counts[bytes_].sum(axis=1)
 
 
 # Graphical User Interface to print or show the board
@@ -336,6 +519,9 @@ class GUI:
         self.width = B.width
         self.height = B.height
 
+        # last board drawn on the screen (None if nothing drawn yet)
+        self.lastBoard = None
+
         # screen set-up
         self.screenOn = screenOn
         if strat1=='s' or strat2=='s':
@@ -365,34 +551,100 @@ class GUI:
                                                self.scr_height])
             pg.display.set_caption('AI-m of the Game: Chomp!')
 
-    # draw the board in the screen
+    # draw the board in the screen. After the first frame, only the
+    # squares that changed since the last drawn board are redrawn
     def drawBoard(self, board):
         # check if X button is clicked
         for event in pg.event.get():
             if event.type == pg.QUIT:
                 exit()
-        
-        # fill screen with background color
-        self.screen.fill(self.white)
-        
-        # draw the squares that are left
-        side = self.sq_side
-        space = self.sq_space
+
+        if self.lastBoard is None:
+            # fill screen with background color
+            self.screen.fill(self.white)
+
+            # draw the squares that are left
+            for x in range(self.height):
+                for y in range(self.width):
+                    self.drawSquare(board, (x,y))
+            pg.display.flip()
+        else:
+            # only redraw the rectangles that changed
+            changed = self.B.getDifferences(self.lastBoard, board)
+            rects = []
+            for (x1, x2, y1, y2) in self.getChangedRects(changed):
+                rect = self.getRect(x1, x2, y1, y2)
+                self.screen.fill(self.white, rect)
+                for x in range(x1, x2+1):
+                    for y in range(y1, y2+1):
+                        self.drawSquare(board, (x,y))
+                rects.append(rect)
+            if rects:
+                pg.display.update(rects)
+        self.lastBoard = self.B.copyBoard(board)
+
+    # draw the square at [x][y] of board, if it's still there
+    def drawSquare(self, board, position):
+        # choose the proper color
+        if position == self.B.squareToPos((1,1)):
+            color = self.red
+        else:
+            color = self.yellow
+
+        x, y = position
+        if self.B.getPosValue(board, position):
+            pg.draw.rect(self.screen, color, self.getRect(x, x, y, y))
+
+    # [x][y] of the board square under the pixel, or None if the pixel
+    # isn't on any square
+    def pixelToPos(self, pixel):
+        mouse_x, mouse_y = pixel
+        step = self.sq_side + self.sq_space
+        # note that x and y convention is flipped b/c pygame!
+        y, offset_x = divmod(mouse_x - self.sq_space, step)
+        x, offset_y = divmod(mouse_y - self.sq_space, step)
+        if offset_x >= self.sq_side or offset_y >= self.sq_side:
+            return None
+        if x < 0 or x >= self.height or y < 0 or y >= self.width:
+            return None
+        return (x, y)
+
+    # screen rectangle covering rows x1..x2 and columns y1..y2 of board
+    # note that x and y convention is flipped b/c pygame!
+    def getRect(self, x1, x2, y1, y2):
+        step = self.sq_side + self.sq_space
+        return pg.Rect(y1*step + self.sq_space, x1*step + self.sq_space, \
+            (y2-y1+1)*step - self.sq_space, (x2-x1+1)*step - self.sq_space)
+
+    # split the set squares of a differences board into rectangles
+    # (x1, x2, y1, y2) of [x][y] positions: each row is split into runs
+    # of set squares, and the same run on consecutive rows is merged
+    # Eg. 0 1 1 0
+    #     0 1 1 1   returns [(0,1,1,2), (1,1,3,3)]
+    def getChangedRects(self, changed):
+        rects = []
+        open_runs = {} # (y1, y2) -> [x1, x2] of the run so far
         for x in range(self.height):
-            for y in range(self.width):
-                # choose the proper color
-                if (x,y) == self.B.squareToPos((1,1)):
-                    color = self.red
+            runs = {}
+            row = changed[x]
+            while row:
+                y1 = QUADWORD-1 - msb(row)
+                y2 = y1
+                while y2+1 < self.width and (row >> (QUADWORD-y2-2)) & 1:
+                    y2 += 1
+                row &= (1 << (QUADWORD-y2-1)) - 1 # clear the run
+                if (y1, y2) in open_runs:
+                    runs[(y1, y2)] = open_runs.pop((y1, y2))
+                    runs[(y1, y2)][1] = x
                 else:
-                    color = self.yellow
-
-                # note that x and y convention is flipped b/c pygame!
-                #if self.B.board[x][y]:
-                if self.B.getPosValue(board, (x,y)):
-                    pg.draw.rect(self.screen, color, \
-                        (y*(side+space)+space, x*(side+space)+space, \
-                        side, side))
-        pg.display.flip()
+                    runs[(y1, y2)] = [x, x]
+            # runs that didn't continue on this row are finished
+            for (y1, y2), (x1, x2) in open_runs.items():
+                rects.append((x1, x2, y1, y2))
+            open_runs = runs
+        for (y1, y2), (x1, x2) in open_runs.items():
+            rects.append((x1, x2, y1, y2))
+        return rects
 
     # print the board in the console
     # assume the exact board convention as in Board class
@@ -421,18 +673,73 @@ class GUI:
             print(bin(row))
         print('\n')
 
+# Node of the Monte Carlo search tree used by Player.MCTSStrat (UCT
+# selection and proven results are in UCTNode)
+class MCTSNode(UCTNode):
+    __slots__ = ('board',)
+
+    # board = position after 'move' was played from parent's position
+    def __init__(self, board, move, parent, B):
+        UCTNode.__init__(self, move, parent)
+        self.board = board
+        self.untried = B.getValidMoves(board)
+        random.shuffle(self.untried)
+        # try the move that ends the game first (it's popped first)
+        finish = finishingMove(board, B)
+        if finish:
+            self.untried.remove(finish)
+            self.untried.append(finish)
+        if B.gameIsOver(board):
+            self.proven = True
+
+# the square that leaves only (1,1) on the board, or None if the
+# game can't be ended in 1 move
+def finishingMove(board, B):
+    bottom = B.height-1
+    if all(board[h] == 0 for h in range(bottom)): # only bottom row left
+        row = board[bottom] & ~one
+        if row:
+            return (QUADWORD - msb(row), 1)
+    elif all(row & ~one == 0 for row in board): # only column 1 left
+        for h in range(bottom-1, -1, -1):
+            if board[h]:
+                return (1, B.height-h)
+    return None
+
 # Player Strategies
 class Player:
+    # strategies that play from the opening book when they can
+    bookStrats = ['g', 'm']
+
+    # MCTSStrat settings: stop after mctsIterations playouts (if not
+    # None) or after mctsTime seconds, whichever comes first
+    mctsIterations = None
+    mctsTime = 0.9
+    mctsC = 1.4 # exploration constant of UCT
+
     # create Player 1 or Player 2
-    def __init__(self, turn, strat):
+    def __init__(self, turn, strat, mctsIterations=None, mctsTime=None):
         self.turn = turn
         self.strat = strat.lower()
-        if self.strat not in ['c', 's', 'r', 'g', 'a1', 'a2']:
+        if self.strat not in ['c', 's', 'r', 'g', 'm', 'a1', 'a2']:
             print("\'%s\' HAS NOT BEEN ADDED HERE YET!!!" % self.strat)
             exit()
+        if mctsIterations is not None:
+            self.mctsIterations = mctsIterations
+        if mctsTime is not None:
+            self.mctsTime = mctsTime
+        # MCTSStrat's tree, kept between turns of the same Game
+        self.tree = None
+        self.treeGame = None
         
     # Given instance of Game, return a winning strategy
     def PlayerStrategy(self, G, board):
+        # search strategies first check the opening book, if any
+        if self.strat in self.bookStrats and G.book:
+            square = G.book.lookup(board, G.B)
+            if square:
+                return square
+
         if self.strat == 'c':
             return self.ConsoleStrat()
         elif self.strat == 's':
@@ -441,6 +748,8 @@ class Player:
             return self.RandomStrat(board, G.B)
         elif self.strat == 'g':
             return self.GreedyStrat(board, G.B)
+        elif self.strat == 'm':
+            return self.MCTSStrat(board, G)
         elif self.strat == 'a1':
             return self.AIStrat1(board, G.B, G.Gui)
         elif self.strat == 'a2':
@@ -475,36 +784,21 @@ class Player:
 
     def ScreenStrat(self, board, G):
         # Screen Strategy - click the proper square on the screen
-        side = G.Gui.sq_side
-        space = G.Gui.sq_space
         while(True):
-            mouse_x, mouse_y = pg.mouse.get_pos()
-
-            clicked = False
-            for event in pg.event.get():
-                if event.type == pg.QUIT:
-                    exit()
-                if event.type == pg.MOUSEBUTTONDOWN:
-                    clicked = event.button==1
-            
-            if clicked:
-                found = False
-                for x in range(G.B.height):
-                    for y in range(G.B.width):
-                        if found:
-                            break
-                        # check if user clicked a square
-                        rect = pg.Rect(y*(side+space)+space, \
-                            x*(side+space)+space, side, side)
-                        if rect.collidepoint(mouse_x, mouse_y):
-                            xpos, ypos = (x,y)
-                            found = True
-                if not found:
-                    continue
+            # sleep until something happens instead of polling
+            event = pg.event.wait()
+            if event.type == pg.QUIT:
+                exit()
+            if event.type != pg.MOUSEBUTTONDOWN or event.button != 1:
+                continue
+
+            position = G.Gui.pixelToPos(event.pos)
+            if position is None: # clicked between squares
+                continue
 
-                square = G.B.posToSquare((xpos, ypos))
-                if G.B.isValidMove(board, square):
-                    return square
+            square = G.B.posToSquare(position)
+            if G.B.isValidMove(board, square):
+                return square
     
     def RandomStrat(self, board, B):
         # Random Strategy - return any valid move
@@ -538,6 +832,121 @@ class Player:
         else: # we couldn't find any good move
             return random.choice(validMoves)
 
+    def MCTSStrat(self, board, G):
+        # Monte Carlo Tree Search Strategy - play lots of random games
+        # from the current board, and grow a tree of the moves that
+        # win the most often (picked with UCT). Moves that surely win
+        # or lose are remembered, and the tree is kept for the next
+        # turn of the same game
+        B = G.B
+        root = self.reuseTree(board, G)
+        start = time.perf_counter()
+        deadline = start + self.mctsTime
+        iterations = 0
+        while root.proven is None:
+            if self.mctsIterations is not None and \
+                    iterations >= self.mctsIterations:
+                break
+            if time.perf_counter() >= deadline:
+                break
+            iterations += 1
+
+            # 1. selection: walk down the fully expanded nodes
+            node = root
+            while not node.untried and node.children \
+                    and node.proven is None:
+                node = node.selectChild(self.mctsC)
+
+            # 2. expansion: add one new child
+            if node.untried and node.proven is None:
+                move = node.untried.pop()
+                node = MCTSNode(B.updateBoard(node.board, move), move, \
+                                node, B)
+                node.parent.children.append(node)
+                node.propagateProof()
+
+            # 3. simulation: play randomly until the game is over.
+            # won = whether the player who played node.move wins
+            if node.proven is not None:
+                won = node.proven
+            else:
+                won = not self.randomPlayout(node.board, B)
+
+            # 4. backpropagation: flip the result at every level
+            while node is not None:
+                node.visits += 1
+                node.wins += won
+                won = not won
+                node = node.parent
+
+        if not root.children: # no time to search at all
+            self.tree = None
+            return random.choice(root.untried)
+
+        # play a move that surely wins, else the most visited move that
+        # doesn't surely lose, and keep its subtree
+        def score(child):
+            return (child.proven is True, child.proven is not False, \
+                    child.visits)
+        best = max(root.children, key=score)
+        best.parent = None
+        self.tree = best
+        return best.move
+
+    # root of the search tree for board: the grandchild of last turn's
+    # root if the opponent's reply was searched, else a new tree
+    def reuseTree(self, board, G):
+        if self.treeGame is G and self.tree is not None:
+            for child in self.tree.children:
+                if child.board == board:
+                    child.parent = None
+                    return child
+        self.treeGame = G
+        self.tree = MCTSNode(G.B.copyBoard(board), None, None, G.B)
+        return self.tree
+
+    # play random moves on a copy of the board until the game is over;
+    # return whether the player to move on board wins
+    def randomPlayout(self, board, B):
+        rows = list(board)
+        bottom = B.height-1
+        toMove = True
+        while True:
+            # count the squares left in each row, except (1,1)
+            counts = [bin(row).count('1') for row in rows]
+            counts[bottom] -= 1
+            total = sum(counts)
+            if total == 0: # only (1,1) left: the last mover won
+                return not toMove
+
+            # if a move leaves only (1,1), always take it
+            if total == counts[bottom]: # only the bottom row is left
+                xpos = bottom
+                ypos = QUADWORD-1 - msb(rows[bottom] & ~one)
+            elif all(row & ~one == 0 for row in rows): # only column 1
+                xpos = max(h for h in range(bottom) if rows[h])
+                ypos = 0
+            else:
+                # pick a random square: find its row, then jump over
+                # the set bits of the row (bit-iteration) until it
+                k = random.randrange(total)
+                xpos = 0
+                while k >= counts[xpos]:
+                    k -= counts[xpos]
+                    xpos += 1
+                row = rows[xpos]
+                if xpos == bottom:
+                    row &= ~one
+                for _ in range(k):
+                    row ^= 1<<msb(row)
+                ypos = QUADWORD-1 - msb(row)
+
+            # take [xpos][ypos] and all squares above/right
+            leftline = line ^ ((1<<(QUADWORD-ypos)) - 1) # 1110000...
+            for h in range(xpos+1):
+                rows[h] &= leftline
+            toMove = not toMove
+
     '''
     AIStrat1 and AIStrat2 is TODO for Teams 1 and 2 respectively.
     Return a valid move using any mathematical or AI strategies.
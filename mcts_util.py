@@ -0,0 +1,55 @@
+'''
+This Monte Carlo Tree Search helper was created for the purposes of
+Project Ignite 2021: AI-m of the Game. Please do not redistribute
+publicly without permission.
+
+This helper file contains the game-independent part of a node of the
+Monte Carlo search tree: the win/visit counts, UCT selection and the
+proven win/loss results. Each game's MCTSNode (see chomp_util.py and
+tictactoe_solution.py) builds on it, and fills in the moves to try and
+whether the game is already won.
+'''
+
+import math
+
+class UCTNode:
+    __slots__ = ('move', 'parent', 'children', 'untried', \
+                 'wins', 'visits', 'proven')
+
+    # node for 'move' played from parent's position (None at the root)
+    def __init__(self, move, parent):
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = [] # moves that don't have a child yet
+        # wins for the player who played 'move', out of visits
+        self.wins = 0
+        self.visits = 0
+        # True/False if the player who played 'move' surely wins/loses
+        self.proven = None
+
+    # child w/ the best upper confidence bound (UCT), skipping the
+    # children that surely lose (unless they all do)
+    def selectChild(self, c):
+        logVisits = math.log(self.visits)
+        children = [child for child in self.children \
+                    if child.proven is not False] or self.children
+        return max(children, key=lambda child: \
+            child.wins/child.visits + c*math.sqrt(logVisits/child.visits))
+
+    # update the proven results after this node was proven. A position
+    # where every move that was tried loses counts as lost
+    def propagateProof(self):
+        node = self
+        while node.parent is not None and node.proven is not None:
+            parent = node.parent
+            if node.proven:
+                # the parent's mover gave us a winning move
+                parent.proven = False
+            elif not parent.untried and \
+                    all(child.proven is False for child in parent.children):
+                # every move from the parent's position loses
+                parent.proven = True
+            else:
+                break
+            node = parent
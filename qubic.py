@@ -0,0 +1,452 @@
+'''
+This Qubic visualizer+algorithm was created for the purposes of Project
+Ignite 2021: AI-m of the Game. Please do not redistribute publicly
+without permission.
+
+Qubic: 3-D Tic-Tac-Toe on a 4x4x4 cube. Each turn, a player places
+their piece (O for Player 1, X for Player 2) on one of the 64 empty
+cells. The player that gets 4 in a row along any of the 76 lines of the
+cube (rows, columns and pillars, the diagonals of every layer and slice,
+and the 4 diagonals through the middle of the cube) is the winner.
+The cube is shown as its 4 layers side by side:
+    Eg. O wins w/ the diagonal from the top-left of layer 1 to the
+    bottom-right of layer 4
+         layer 1           layer 2           layer 3           layer 4
+    |---------------| |---------------| |---------------| |---------------|
+    | O |   |   |   | |   | X |   |   | |   |   | X |   | |   |   |   |   |
+    |---------------| |---------------| |---------------| |---------------|
+    |   |   |   |   | |   | O |   |   | |   |   |   |   | |   |   |   |   |
+    |---------------| |---------------| |---------------| |---------------|
+    |   |   |   |   | |   |   |   |   | |   |   | O |   | |   |   |   |   |
+    |---------------| |---------------| |---------------| |---------------|
+    |   |   |   | X | |   |   |   |   | |   |   |   |   | |   |   |   | O |
+    |---------------| |---------------| |---------------| |---------------|
+
+Like BitboardPruningStrat in tictactoe_solution.py, each player's
+pieces are a single number, w/ bit i = 16*layer + 4*row + column set
+for every cell they have, and every line is a precomputed 64-bit mask.
+Positions are (x, y, z): column from the left, row from the bottom and
+layer, all 1-4.
+'''
+
+import pygame as pg
+import random, time
+from tictactoe_solution import SearchTimeout
+
+black = (0,0,0)
+white = (255,255,255)
+blue = (0, 0, 255) # for Player 1 (O)
+red = (255, 0, 0) # for Player 2 (X)
+SIZE = 50 # size of each cell (in pixels)
+GAP = 20  # space between the layers (in pixels)
+
+##### Lines #####
+# the 13 directions of a line (and their opposites), as (layer, row,
+# column) steps
+DIRECTIONS = [(dz, dr, dc) for dz in [0, 1] for dr in [-1, 0, 1] \
+              for dc in [-1, 0, 1] if (dz, dr, dc) > (0, 0, 0)]
+
+def cellIndex(z, row, col):
+    return 16*z + 4*row + col
+
+# every line of 4 as a mask; a line starts at a cell if its 4 cells
+# fit in the cube
+LINES = []
+for z in range(4):
+    for row in range(4):
+        for col in range(4):
+            for (dz, dr, dc) in DIRECTIONS:
+                if all(0 <= v + 3*d < 4 for (v, d) in \
+                       [(z, dz), (row, dr), (col, dc)]):
+                    LINES.append(sum(1 << cellIndex(z + i*dz, row + i*dr, \
+                        col + i*dc) for i in range(4)))
+assert len(LINES) == 76
+
+# CELL_LINES[i] = indexes of the lines through cell i
+CELL_LINES = [[l for l in range(len(LINES)) if LINES[l] >> i & 1] \
+              for i in range(64)]
+
+FULL_MASK = (1<<64) - 1
+
+##### Game Tools #####
+
+# LINE_SCORE[own][opp]: how good a line with own and opp pieces is for
+# own; lines that both players have a piece in are worth nothing
+LINE_SCORE = [[0]*5 for _ in range(5)]
+for count, score in enumerate([0, 1, 8, 64]):
+    LINE_SCORE[count][0] = score
+    LINE_SCORE[0][count] = -score
+
+class QubicBoard:
+    def __init__(self):
+        self.turn = 1 # player to move (1 or 2)
+        self.masks = [0, 0, 0] # masks[player] = player's cells
+        # counts[player][l] = player's pieces on line l, kept up to date
+        # by place() and unplace() so threats never have to be searched
+        self.counts = [None, [0]*len(LINES), [0]*len(LINES)]
+        # threats[player] = lines where player has 3 and the other 0
+        self.threats = [0, 0, 0]
+        self.score = 0 # sum of LINE_SCORE of every line, for Player 1
+        self.winner = 0
+        self.history = []
+
+    # same as gameIsDone in tictactoe_solution.py: winner (1 or 2),
+    # 0 if ongoing, or 3 if tie
+    def result(self):
+        if self.winner:
+            return self.winner
+        if self.masks[1] | self.masks[2] == FULL_MASK:
+            return 3
+        return 0
+
+    def validMoves(self):
+        taken = self.masks[1] | self.masks[2]
+        return [i for i in range(64) if not taken >> i & 1]
+
+    # add (sign=+1) or take away (sign=-1) player 'turn''s piece on cell i
+    # in the line counts, threats and score
+    def count(self, i, turn, sign):
+        own, opp = self.counts[turn], self.counts[3-turn]
+        for l in CELL_LINES[i]:
+            if turn == 1:
+                self.score -= LINE_SCORE[own[l]][opp[l]]
+            else:
+                self.score -= LINE_SCORE[opp[l]][own[l]]
+            self.threats[turn] -= own[l] == 3 and opp[l] == 0
+            self.threats[3-turn] -= opp[l] == 3 and own[l] == 0
+            own[l] += sign
+            self.threats[turn] += own[l] == 3 and opp[l] == 0
+            self.threats[3-turn] += opp[l] == 3 and own[l] == 0
+            if turn == 1:
+                self.score += LINE_SCORE[own[l]][opp[l]]
+            else:
+                self.score += LINE_SCORE[opp[l]][own[l]]
+
+    # the player to move places a piece on cell i
+    def place(self, i):
+        turn = self.turn
+        self.history.append((i, self.winner))
+        self.masks[turn] |= 1 << i
+        self.count(i, turn, +1)
+        for l in CELL_LINES[i]:
+            if self.counts[turn][l] == 4:
+                self.winner = turn
+        self.turn = 3 - turn
+
+    # take back the last move
+    def unplace(self):
+        (i, winner) = self.history.pop()
+        turn = 3 - self.turn
+        self.masks[turn] ^= 1 << i
+        self.count(i, turn, -1)
+        self.winner = winner
+        self.turn = turn
+
+    # empty cells that would complete a line for player 'turn'
+    def winningCells(self, turn):
+        taken = self.masks[1] | self.masks[2]
+        cells = set()
+        if not self.threats[turn]:
+            return cells
+        own, opp = self.counts[turn], self.counts[3-turn]
+        for l in range(len(LINES)):
+            if own[l] == 3 and opp[l] == 0:
+                empty = LINES[l] & ~taken
+                cells.add(empty.bit_length() - 1)
+        return cells
+
+    def piece(self, i):
+        if self.masks[1] >> i & 1: return 1
+        if self.masks[2] >> i & 1: return 2
+        return 0
+
+# (x, y, z) (column from the left, row from the bottom, layer; all 1-4)
+# to cell index, and back
+def xyz_to_cell(xyz):
+    (x, y, z) = xyz
+    return cellIndex(z-1, 4-y, x-1)
+
+def cell_to_xyz(i):
+    (z, rest) = divmod(i, 16)
+    (row, col) = divmod(rest, 4)
+    return (col+1, 4-row, z+1)
+
+def xyz_is_valid(xyz, state):
+    if len(xyz) != 3 or not all(1 <= v <= 4 for v in xyz):
+        return False
+    return state.piece(xyz_to_cell(xyz)) == 0
+
+def gameIsDone(state):
+    return state.result()
+
+##### GUI Tools #####
+
+def drawO(px, py):
+    pg.draw.circle(screen, blue, (px + SIZE//2, py + SIZE//2), \
+        SIZE*4//10, SIZE*15//100)
+def drawX(px, py):
+    pg.draw.line(screen, red, (px + SIZE//4, py + SIZE//5), \
+        (px + SIZE*3//4, py + SIZE*4//5), SIZE//5)
+    pg.draw.line(screen, red, (px + SIZE*3//4, py + SIZE//5), \
+        (px + SIZE//4, py + SIZE*4//5), SIZE//5)
+
+# top-left pixel of cell i
+def cellPixel(i):
+    (z, rest) = divmod(i, 16)
+    (row, col) = divmod(rest, 4)
+    return (z*(4*SIZE + GAP) + col*SIZE, row*SIZE)
+
+def drawBoard(state):
+    screen.fill(white)
+    for i in range(64):
+        (px, py) = cellPixel(i)
+        pg.draw.rect(screen, black, (px, py, SIZE, SIZE), 2)
+        piece = state.piece(i)
+        if piece==1:   drawO(px, py)
+        elif piece==2: drawX(px, py)
+
+    # draw the winning line, from its first to its last cell
+    if state.winner:
+        for line in LINES:
+            if state.masks[state.winner] & line == line:
+                first = cellPixel((line & -line).bit_length() - 1)
+                last = cellPixel(line.bit_length() - 1)
+                pg.draw.line(screen, black, \
+                    (first[0] + SIZE//2, first[1] + SIZE//2), \
+                    (last[0] + SIZE//2, last[1] + SIZE//2), SIZE//10)
+    pg.display.flip()
+
+def printBoard(state):
+    TableTB = "|---------------|"
+    print(" ".join("    layer %d     " % (z+1) for z in range(4)))
+    print(" ".join([TableTB]*4))
+    for row in range(4):
+        layers = []
+        for z in range(4):
+            text = "|"
+            for col in range(4):
+                piece = state.piece(cellIndex(z, row, col))
+                text += " X |" if piece==2 else " O |" if piece==1 \
+                    else "   |"
+            layers.append(text)
+        print(" ".join(layers))
+        print(" ".join([TableTB]*4))
+
+##### Player 1's and 2's Strategies #####
+# state = current QubicBoard
+# return position (x, y, z) of where to place piece
+
+def RandomStrat(state):
+    return cell_to_xyz(random.choice(state.validMoves()))
+
+WIN_SCORE = 100000
+EXACT, LOWER, UPPER = 0, 1, 2 # transposition table flags
+
+# moves in the order to try them: the table's best move, wins, blocks,
+# then the cells w/ the most lines still open
+def orderMoves(state, ttMove):
+    turn = state.turn
+    wins = state.winningCells(turn)
+    blocks = state.winningCells(3-turn)
+    opp = state.counts[3-turn]
+    def key(i):
+        openLines = sum(1 for l in CELL_LINES[i] if opp[l] == 0)
+        return (i != ttMove, i not in wins, i not in blocks, -openLines)
+    return sorted(state.validMoves(), key=key)
+
+# alpha-beta (negamax form: scores are always for the player to move)
+# with a transposition table:
+#     table[(Player 1's mask, Player 2's mask)] = [depth, score, flag, move]
+# Outputs:
+#     [best cell, score]
+def negamax(state, depth, alpha, beta, table, deadline):
+    if time.perf_counter() > deadline:
+        raise SearchTimeout()
+    result = state.result()
+    if result:
+        if result == 3:
+            return [None, 0]
+        # the player who just moved won; sooner is better
+        return [None, -WIN_SCORE - depth]
+
+    # a player w/ a line of 3 wins next move; 2 of them can't be blocked
+    turn = state.turn
+    if state.threats[turn]:
+        return [min(state.winningCells(turn)), WIN_SCORE + depth - 1]
+    blocks = state.winningCells(3-turn)
+    if len(blocks) >= 2:
+        return [min(blocks), -WIN_SCORE - depth + 2]
+    if depth == 0:
+        score = state.score if turn == 1 else -state.score
+        return [None, score]
+
+    key = (state.masks[1], state.masks[2])
+    entry = table.get(key)
+    ttMove = None
+    if entry:
+        [entryDepth, score, flag, ttMove] = entry
+        if entryDepth >= depth:
+            if flag == EXACT:
+                return [ttMove, score]
+            elif flag == LOWER:
+                alpha = max(alpha, score)
+            elif flag == UPPER:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return [ttMove, score]
+    alphaOrig = alpha
+
+    # if the opponent threatens to win, we have to block
+    moves = orderMoves(state, ttMove)
+    if blocks:
+        moves = [i for i in moves if i in blocks]
+
+    best = [moves[0], -2*WIN_SCORE]
+    for i in moves:
+        state.place(i)
+        try:
+            [_, score] = negamax(state, depth-1, -beta, -alpha, table, \
+                deadline)
+        finally:
+            state.unplace()
+        score = -score
+        if score > best[1]:
+            best = [i, score]
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            break
+
+    if best[1] <= alphaOrig:
+        flag = UPPER
+    elif best[1] >= beta:
+        flag = LOWER
+    else:
+        flag = EXACT
+    table[key] = [depth, best[1], flag, best[0]]
+    return best
+
+# search deeper and deeper for 'timeLimit' seconds, and play the best
+# move of the deepest search that finished. The table is shared by
+# every depth, so each search starts w/ the last one's best moves.
+# If verbose, print how many moves ahead that search looked
+def AlphaBetaStrat(timeLimit, state, verbose=False):
+    deadline = time.perf_counter() + timeLimit
+    table = {}
+    bestMove = state.validMoves()[0]
+    searched = 0
+    for depth in range(1, 65):
+        try:
+            [move, score] = negamax(state, depth, -2*WIN_SCORE, \
+                2*WIN_SCORE, table, deadline)
+        except SearchTimeout:
+            break
+        bestMove = move
+        searched = depth
+        # the game is decided; searching deeper won't help
+        if abs(score) >= WIN_SCORE:
+            break
+    if verbose:
+        print("Searched %d moves ahead" % searched)
+    return cell_to_xyz(bestMove)
+
+def ConsoleStrat():
+    # Console Strategy - get "x y z" (or "x,y,z") from the console
+    while(True):
+        try:
+            taken = input().strip()
+            for char in ['(', ')', ',']:
+                taken = taken.replace(char, ' ')
+            values = taken.split()
+            if len(values) == 1 and len(values[0]) == 3:
+                values = list(values[0])
+            if len(values) != 3:
+                print("Not a valid input")
+                continue
+            return tuple(int(v) for v in values)
+        except ValueError:
+            print("Not a valid input")
+
+def ScreenStrat(state):
+    # Screen Strategy - click the proper cell on the screen
+    while(True):
+        event = pg.event.wait()
+        if event.type == pg.QUIT:
+            exit()
+        if event.type == pg.MOUSEBUTTONDOWN:
+            (mouse_x, mouse_y) = event.pos
+            (z, x) = divmod(mouse_x, 4*SIZE + GAP)
+            if x >= 4*SIZE or mouse_y >= 4*SIZE:
+                continue
+            xyz = (x//SIZE + 1, 4 - mouse_y//SIZE, z + 1)
+            if xyz_is_valid(xyz, state):
+                return xyz
+
+def HumanStrat(state, screenOn):
+    if screenOn: return ScreenStrat(state)
+    else:        return ConsoleStrat()
+
+# given the board, return a position (x, y, z) to place the next piece
+def Player1Strategy(state, screenOn): # CHANGE ME!
+    return HumanStrat(state, screenOn)
+    # return RandomStrat(state)
+    # return AlphaBetaStrat(1.0, state)
+    # return AlphaBetaStrat(1.0, state, verbose=True)
+
+def Player2Strategy(state, screenOn): # CHANGE ME!
+    return AlphaBetaStrat(1.0, state)
+    # return HumanStrat(state, screenOn)
+    # return RandomStrat(state)
+    # return AlphaBetaStrat(1.0, state, verbose=True)
+
+
+##### Main Function #####
+def main():
+    global screen
+
+    # Decide if you want pygame (True) or console (False)
+    screenOn = True # CHANGE ME!
+    state = QubicBoard()
+
+    if screenOn:
+        pg.init()
+        screen = pg.display.set_mode([4*(4*SIZE + GAP) - GAP, 4*SIZE])
+
+    print("Welcome to Qubic!")
+    if screenOn: drawBoard(state)
+    else:        printBoard(state)
+    while True:
+        # Exit if X is pushed
+        if screenOn:
+            for event in pg.event.get():
+                if event.type == pg.QUIT:
+                    exit()
+
+        # Prompt for location of player's piece
+        turn = state.turn
+        print("Player %d, where will you place your piece?" % turn)
+        if turn == 1:
+            xyz = Player1Strategy(state, screenOn)
+        elif turn == 2:
+            xyz = Player2Strategy(state, screenOn)
+
+        # Check if valid location
+        if not xyz_is_valid(xyz, state):
+            print("You cannot take this position. Try again.")
+            continue
+
+        # Update board, then check win condition
+        state.place(xyz_to_cell(xyz))
+        if screenOn: drawBoard(state)
+        else:        printBoard(state)
+        if gameIsDone(state):
+            break
+
+    if gameIsDone(state) == 3:
+        print("Game is a tie!")
+    else:
+        print("Player %d is the winner!" % gameIsDone(state))
+    if screenOn:
+        time.sleep(2)
+
+if __name__ == "__main__":
+    main()
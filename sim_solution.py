@@ -15,37 +15,109 @@ Important: by Ramsey theory, this game cannot end in a tie!
     Eg. Hard to show in comments, see http://www.papg.com/images/Sim.gif
 '''
 
+from array import array
 from copy import deepcopy
 import pygame as pg
+import itertools
 import math
+import mmap
+import os
 import random
 import time
 
-# Initialize pygame
-pg.init()
-
-# Set up the drawing window
-screen = pg.display.set_mode([500, 500])
-
-# Create a 6x6 matrix, representing all possible edges between 2 points
-# Each points is represented from 0 to 5
-# 0 = not taken, 1 = taken by P1, 2 = taken by P2, -1 = impossible
-board = [[-1, 0, 0, 0, 0, 0], 
-         [0, -1, 0, 0, 0, 0], 
-         [0, 0, -1, 0, 0, 0], 
-         [0, 0, 0, -1, 0, 0], 
-         [0, 0, 0, 0, -1, 0], 
-         [0, 0, 0, 0, 0, -1]]
+# the drawing window; set up in main()
+screen = None
+
+##### Edge Tables #####
+
+# The 15 edges are numbered 0-14 in getValidMoves() order, and each
+# player's edges are kept as a 15-bit mask (bit e = edge EDGES[e])
+EDGES = [(i,j) for i in range(5) for j in range(i+1,6)]
+ALL_EDGES = (1 << len(EDGES)) - 1
+
+# EDGE_BIT[x1][x2] = mask of edge (x1,x2), or 0 if x1 == x2
+EDGE_BIT = [[0]*6 for _ in range(6)]
+for e, (x1, x2) in enumerate(EDGES):
+    EDGE_BIT[x1][x2] = EDGE_BIT[x2][x1] = 1 << e
+
+# masks of the 3 edges of each of the 20 triangles, and their dots
+TRIANGLE_DOTS = [(i,j,k) for i in range(4) for j in range(i+1,5) \
+                 for k in range(j+1,6)]
+TRIANGLES = [EDGE_BIT[i][j] | EDGE_BIT[i][k] | EDGE_BIT[j][k] \
+             for (i,j,k) in TRIANGLE_DOTS]
+
+# COMPLETES[e] = the other 2 edges (a, b) of the 4 triangles w/ edge e,
+# as masks; taking e loses if you already have both a and b
+COMPLETES = [tuple((EDGE_BIT[x1][p], EDGE_BIT[x2][p]) for p in range(6) \
+                   if p != x1 and p != x2) for (x1, x2) in EDGES]
+
+# LOSING_EDGES[mask] = mask of every edge that would complete a triangle
+# w/ 2 of the edges in mask. Built up one edge at a time from COMPLETES:
+# adding edge e to 'rest' makes b losing for each triangle (e, a, b)
+# where rest already has a
+LOSING_EDGES = array('H', bytes(2 << len(EDGES)))
+for mask in range(1, ALL_EDGES+1):
+    bit = mask & -mask
+    rest = mask ^ bit
+    losing = LOSING_EDGES[rest]
+    for (a, b) in COMPLETES[bit.bit_length() - 1]:
+        if rest & a:
+            losing |= b
+        if rest & b:
+            losing |= a
+    LOSING_EDGES[mask] = losing
+
+# the edge numbers in each byte of a mask, so maskEdges() can list them
+# w/ 2 lookups
+LOW_EDGES = [tuple(e for e in range(8) if m >> e & 1) for m in range(256)]
+HIGH_EDGES = [tuple(e+8 for e in range(8) if m >> e & 1) for m in range(256)]
+
+# list the edge numbers in a mask, from lowest to highest
+def maskEdges(mask):
+    return LOW_EDGES[mask & 255] + HIGH_EDGES[mask >> 8]
+
+# true iff the edges in mask contain a triangle (ie. one of its edges
+# completes a triangle w/ 2 others; same as checking all of TRIANGLES)
+def hasTriangle(mask):
+    return mask & LOSING_EDGES[mask] != 0
+
+# mask of the edges in 'empty' that would complete a triangle of 'mask'
+def losingMask(mask, empty):
+    return LOSING_EDGES[mask] & empty
+
+##### Game State #####
+
+# Everything about one game of Sim. Each game (or search) gets its own
+# SimState, so several of them can run side by side, eg. in a thread or
+# process pool.
+class SimState:
+    def __init__(self):
+        # the edges taken by each player, as 15-bit masks (see EDGES);
+        # masks[1] = Player 1's edges, masks[2] = Player 2's edges
+        self.masks = [0, 0, 0]
+
+        # which moves were made
+        self.red_edges = [] # red = Player 1
+        self.blue_edges = [] # blue = Player 2
+
+        # used for HumanStrat to see which dots are selected
+        self.selection = []
+
+    # an independent copy, eg. to search on in another thread
+    def copy(self):
+        return deepcopy(self)
+
+    # make a move for real (unlike addEdge, which searches also use)
+    def play(self, edge, turn):
+        addEdge(edge, turn, self)
+        if turn == 1:
+            self.red_edges.append(edge)
+        else:
+            self.blue_edges.append(edge)
 
-# used for HumanStrat to see which dots are selected
-selection = []
 
 ##### Drawing Functions #####
 
-# which moves were made
-red_edges = [] # red = Player 1
-blue_edges = [] # blue = Player 2
-
 # helpful trig shortcuts; input is degrees
 def cos(angle):
     return math.cos(math.radians(angle))
@@ -99,11 +171,9 @@ def points_to_xy(points):
     return [dots[p] for p in points]
 
 # draw the dots and lines on the board
-def draw(turn):
-    global selection
-
+def draw(turn, state):
     # Fill the whole screen with a background color!
-    result = gameIsDone(turn)
+    result = gameIsDone(turn, state)
     if result==0:
         screen.fill(white)
     else:
@@ -111,25 +181,25 @@ def draw(turn):
 
     # Draw all the dots first
     for i in range(len(dots)):
-        if i in selection: # selected a dot
+        if i in state.selection: # selected a dot
             draw_dot_i(i, soft_color[turn])
         else:
             draw_dot_i(i, black)
     
     # Draw the red and blue edges, in order of appearance
-    for i in range(len(red_edges)):
+    for i in range(len(state.red_edges)):
         # red first
-        [p1,p2] = points_to_xy(red_edges[i])
+        [p1,p2] = points_to_xy(state.red_edges[i])
         draw_line(p1, p2, main_color[1], 14)
 
         # then blue, if possible
-        if i < len(blue_edges):
-            [p1,p2] = points_to_xy(blue_edges[i])
+        if i < len(state.blue_edges):
+            [p1,p2] = points_to_xy(state.blue_edges[i])
             draw_line(p1, p2, main_color[2], 14)
 
     # Redraw the dots and edges of your triangle if the game is over
     if result:
-        [t1,t2,t3] = getTriangle(turn)
+        [t1,t2,t3] = getTriangle(turn, state)
         for i in [t1,t2,t3]:
             draw_dot_i(i, main_color[turn])
         for pair in [(t1,t2), (t1,t3), (t2,t3)]:
@@ -138,7 +208,7 @@ def draw(turn):
         
 
     # Also draw the safe edges that don't lose the game!
-    for edge in getSafeMoves(turn):
+    for edge in getSafeMoves(turn, state):
         p1 = point_to_xy(edge[0])
         p2 = point_to_xy(edge[1])
         draw_line(p1, p2, main_color[turn], 1)
@@ -146,11 +216,12 @@ def draw(turn):
     # Finally, flip the display
     pg.display.flip()
 
-# print the current 2D board
-def printBoard():
+# print the current board as a 6x6 matrix of all possible edges between
+# 2 points: 0 = not taken, 1 = taken by P1, 2 = taken by P2, -1 = impossible
+def printBoard(state):
     for i in range(6):
         for j in range(6):
-            print(board[i][j], end=' ')
+            print(getEdge((i,j), state), end=' ')
         print()
 
 
@@ -159,132 +230,116 @@ def printBoard():
 
 # return list of all legal (x1,x2) moves on the current board
 # note we don't need to know whose move it is
-def getValidMoves():
-    blank_edges = []
-    for i in range(5): # 0-4
-        for j in range(i,6): # 1-5
-            if board[i][j] == 0:
-                blank_edges.append((i,j)) # increasing order
-    return blank_edges
+def getValidMoves(state):
+    empty = ALL_EDGES & ~(state.masks[1] | state.masks[2])
+    return [EDGES[e] for e in maskEdges(empty)] # increasing order
 
 # determine if edge (x1, x2) is valid (ie. in getValidMoves()) or not
-def edge_is_valid(edge):
+def edge_is_valid(edge, state):
     [x1,x2] = edge
-    return board[x1][x2] == 0
+    bit = EDGE_BIT[x1][x2]
+    return bit != 0 and not (state.masks[1] | state.masks[2]) & bit
 
-def addEdge(edge, turn):
-    global board
+def addEdge(edge, turn, state):
     [x1,x2] = edge
     assert x1!=x2 and x1>=0 and x2>=0 and x1<=5 and x2<=5
-    board[x1][x2] = turn
-    board[x2][x1] = turn
+    state.masks[turn] |= EDGE_BIT[x1][x2]
 
-def removeEdge(edge):
-    global board
+def removeEdge(edge, state):
     [x1,x2] = edge
     assert x1!=x2 and x1>=0 and x2>=0 and x1<=5 and x2<=5
-    board[x1][x2] = 0
-    board[x2][x1] = 0
+    bit = EDGE_BIT[x1][x2]
+    state.masks[1] &= ~bit
+    state.masks[2] &= ~bit
 
-def getEdge(edge):
+# 0 = not taken, 1 = taken by P1, 2 = taken by P2, -1 = impossible
+def getEdge(edge, state):
     [x1,x2] = edge
-    return board[x1][x2]
+    bit = EDGE_BIT[x1][x2]
+    if not bit:
+        return -1
+    if state.masks[1] & bit:
+        return 1
+    if state.masks[2] & bit:
+        return 2
+    return 0
 
 # number of Player turn's edges attached to point p
-def degree(p, turn):
+def degree(p, turn, state):
     counter = 0
     for i in range(6):
-        if getEdge((p,i)) == turn:
+        if getEdge((p,i), state) == turn:
             counter += 1
     return counter
 
 # same as degree, but for both players
-def fullDegree(p):
+def fullDegree(p, state):
     counter = 0
     for i in range(6):
-        tmp = getEdge((p,i))
+        tmp = getEdge((p,i), state)
         if tmp == 1 or tmp == 2:
             counter += 1
     return counter
 
 # return true iff there's a cycle of length 3 w/ color 'turn'
-def isCycleOfThree(turn):
-    for i in range(4): # 0-3
-        for j in range(i+1,5): # 1-4
-            if getEdge((i,j)) == turn:
-                for k in range(j+1,6): #2-5
-                    if getEdge((i,k)) == turn and getEdge((j,k)) == turn:
-                        return True
-    return False
+def isCycleOfThree(turn, state):
+    return hasTriangle(state.masks[turn])
 
 # like isCycleOfThree(turn), but return the points that created the triangle
-# assume that isCycleOfThree(turn) == True
-def getTriangle(turn):
-    for i in range(4): # 0-3
-        for j in range(i+1,5): # 1-4
-            if getEdge((i,j)) == turn:
-                for k in range(j+1,6): #2-5
-                    if getEdge((i,k)) == turn and getEdge((j,k)) == turn:
-                        return (i,j,k)
+# assume that isCycleOfThree(turn, state) == True
+def getTriangle(turn, state):
+    mask = state.masks[turn]
+    for t in range(len(TRIANGLES)):
+        if mask & TRIANGLES[t] == TRIANGLES[t]:
+            return TRIANGLE_DOTS[t]
     print("ERROR USING THIS FUNCTION!")
 
 
 
 
+# return [safe, losing] as masks of edge numbers
+def getSafeLosingMasks(turn, state):
+    # losing moves are the empty edges that complete a triangle
+    # w/ 2 of the player's edges
+    empty = ALL_EDGES & ~(state.masks[1] | state.masks[2])
+    losing = losingMask(state.masks[turn], empty)
+    return (empty & ~losing, losing)
+
 # return [safe, losing]
-def getSafeLosingMoves(turn):
-    # all losing moves are where the player's edges are on the same row
-    # or column in board[][]
-    
-    losing = []
-    for i in range(6): # for each row
-        # get all edges in that row w/ board value 'turn'
-        cols = [j for j in range(6) if board[i][j]==turn]
-        if len(cols) > 1:
-            # get all permutations of the values in cols
-            for j in range(len(cols)-1):
-                for k in range(j+1, len(cols)):
-                    if edge_is_valid((cols[j],cols[k])):
-                        x1 = cols[j]
-                        x2 = cols[k]
-                        losing.append( (min(x1,x2), max(x1,x2)) )
-    
-    safe = []
-    for edge in getValidMoves():
-        if edge not in losing:
-            safe.append(edge)
-    
-    return (safe, losing)
+def getSafeLosingMoves(turn, state):
+    [safe, losing] = getSafeLosingMasks(turn, state)
+    return ([EDGES[e] for e in maskEdges(safe)], \
+            [EDGES[e] for e in maskEdges(losing)])
 
 # return list of all (x1,x2) that makes turn player lose the game
-def getLosingMoves(turn):
-    [_, losing] = getSafeLosingMoves(turn)
+def getLosingMoves(turn, state):
+    [_, losing] = getSafeLosingMoves(turn, state)
     return losing
 
-def getLosingMoves2(turn): # too slow!
+def getLosingMoves2(turn, state): # too slow!
     losing = []
-    for edge in getValidMoves():
+    for edge in getValidMoves(state):
         # try adding edge, and if we lose, it's a losing move
-        addEdge(edge, turn)
-        if isCycleOfThree(turn):
+        addEdge(edge, turn, state)
+        if isCycleOfThree(turn, state):
             losing.append(edge)
-        removeEdge(edge)
+        removeEdge(edge, state)
     return losing
 
 # the exact opposite of getLosingMoves(); returns a list of 
 # moves that don't cause turn player to lose
-def getSafeMoves(turn):
-    [safe, _] = getSafeLosingMoves(turn)
+def getSafeMoves(turn, state):
+    [safe, _] = getSafeLosingMoves(turn, state)
     return safe
 
-def getSafeMoves2(turn): # too slow!
+def getSafeMoves2(turn, state): # too slow!
     safe = []
-    for edge in getValidMoves():
+    for edge in getValidMoves(state):
         # try adding edge, and if we don't lose, it's a safe move
-        addEdge(edge, turn)
-        if not isCycleOfThree(turn):
+        addEdge(edge, turn, state)
+        if not isCycleOfThree(turn, state):
             safe.append(edge)
-        removeEdge(edge)
+        removeEdge(edge, state)
     return safe
 
 
@@ -292,23 +347,23 @@ def getSafeMoves2(turn): # too slow!
 # turn = turn of the player who has yet to make a move;
 # return 0 if you didn't lose, return ~turn (opponent's turn)
 # if you lose
-def gameIsDone(turn):
+def gameIsDone(turn, state):
     oppTurn = 2 if turn==1 else 1
-    if isCycleOfThree(turn):
+    if isCycleOfThree(turn, state):
         return oppTurn
     return 0
 
 # full gameIsDone(), without worrying about turn
-def fullGameIsDone():
-    if isCycleOfThree(1):
+def fullGameIsDone(state):
+    if isCycleOfThree(1, state):
         return 2
-    elif isCycleOfThree(2):
+    elif isCycleOfThree(2, state):
         return 1
     return 0
 
 
 ##### Player 1's and 2's Strategies #####
-# no parameters; state variables are global
+# the SimState to move in is passed in explicitly
 # return edge (x1,x2) to take
 
 
@@ -317,23 +372,23 @@ def intersection(lst1, lst2):
     lst3 = [value for value in lst1 if value in lst2]
     return lst3
 
-def RandomStrat(turn):
+def RandomStrat(turn, state):
     # Random Strategy - simply choose a random edge
     # that doesn't lose the game (if possible)
 
-    safe = getSafeMoves(turn)
+    safe = getSafeMoves(turn, state)
     if safe:
         return random.choice(safe)
     # Every move loses. Just end your misery randomly.
-    return random.choice(getValidMoves())
+    return random.choice(getValidMoves(state))
 
-def OffensiveStrat(turn):
+def OffensiveStrat(turn, state):
     # Offensive Strategy - reduce the opponent's safe moves by
     # taking one of them (if safe)
 
     oppTurn = 2 if turn==1 else 1
-    safe = getSafeMoves(turn) # our safe moves
-    oppSafe = getSafeMoves(oppTurn) # opponent's safe moves
+    safe = getSafeMoves(turn, state) # our safe moves
+    oppSafe = getSafeMoves(oppTurn, state) # opponent's safe moves
 
     if safe:
         if oppSafe: # choose one of the opponent's safe moves
@@ -342,18 +397,18 @@ def OffensiveStrat(turn):
             return random.choice(safe)
     
     # Every move loses. Just end your misery randomly.
-    return random.choice(getValidMoves())
+    return random.choice(getValidMoves(state))
 
-def DefensiveStrat(turn):
+def DefensiveStrat(turn, state):
     # Defensive Strategy - avoid making edges with a dot you already
     # used. Keep track of which dots you used the least.
 
-    safe = getSafeMoves(turn)
+    safe = getSafeMoves(turn, state)
     if not safe:
-        return random.choice(getValidMoves())
+        return random.choice(getValidMoves(state))
 
     # Count how many times each dot 0,1,...,5 was used for an edge
-    dotUsage = [fullDegree(i) for i in range(6)]
+    dotUsage = [fullDegree(i, state) for i in range(6)]
 
     # Priorize safe edges that use dots that occur the least.
     # We do this by evaluating all safe edges and sorting them.
@@ -369,16 +424,17 @@ def DefensiveStrat(turn):
     return random.choice(best_edges)
 
 # minimax with pruning
-def MinimaxPruningStrat(depth, turn):
-    [x1, x2, _] = mmpruning(depth, turn, turn, -1000, +1000)
+def MinimaxPruningStrat(depth, turn, state):
+    [x1, x2, _] = mmpruning(depth, turn, turn, -1000, +1000, state)
     return (x1,x2)
 
 # alpha = largest reachable score by us
 # beta = smallest reachable score by opponent
-def mmpruning(depth, turn, curTurn, alpha, beta):
+def mmpruning(depth, turn, curTurn, alpha, beta, state):
     
-    # return if leaf state
-    over = gameIsDone(curTurn)
+    # return if leaf state (same as gameIsDone, straight from the masks)
+    nextTurn = 2 if curTurn==1 else 1
+    over = nextTurn if hasTriangle(state.masks[curTurn]) else 0
 
     # check terminal end states
     # should WIN sooner than later and LOSE later than sooner
@@ -391,24 +447,24 @@ def mmpruning(depth, turn, curTurn, alpha, beta):
     if depth == 0:
         return [-1, -1, 0]
 
-    nextTurn = 2 if curTurn==1 else 1
-
     if curTurn == turn:
         best = [-1, -1, -100]
     else:
         best = [-1, -1, +100]
 
-    [safe, losing] = getSafeLosingMoves(curTurn)
-    validMoves = safe+losing
-    for edge in validMoves:
-        
+    # try the safe edges first; add and remove them right on the masks
+    [safe, losing] = getSafeLosingMasks(curTurn, state)
+    masks = state.masks
+    for e in maskEdges(safe) + maskEdges(losing):
+        bit = 1 << e
+
         # run minimax again
-        addEdge(edge, curTurn)
-        result = mmpruning(depth-1, turn, nextTurn, alpha, beta)
-        removeEdge(edge)
+        masks[curTurn] |= bit
+        result = mmpruning(depth-1, turn, nextTurn, alpha, beta, state)
+        masks[curTurn] ^= bit
 
         # update best
-        (result[0], result[1]) = edge
+        (result[0], result[1]) = EDGES[e]
         if curTurn == turn and result[2] > best[2]:
             best = result
         elif curTurn != turn and result[2] < best[2]:
@@ -426,12 +482,13 @@ def mmpruning(depth, turn, curTurn, alpha, beta):
 
 
 # negamax with pruning
-def NegamaxStrat(depth, turn):
-    [x1, x2, _] = negamax(depth, turn, turn, 1, -1000, +1000)
+def NegamaxStrat(depth, turn, state):
+    [x1, x2, _] = negamax(depth, turn, turn, 1, -1000, +1000, state)
     return (x1,x2)
 # essentially minimax with simpler logic
-def negamax(depth, turn, curTurn, color, alpha, beta):
-    over = gameIsDone(curTurn)
+def negamax(depth, turn, curTurn, color, alpha, beta, state):
+    nextTurn = 2 if curTurn==1 else 1
+    over = nextTurn if hasTriangle(state.masks[curTurn]) else 0
     
     if over:
         score = +1 if over==turn else -1
@@ -439,21 +496,22 @@ def negamax(depth, turn, curTurn, color, alpha, beta):
     if depth == 0:
         return [-1, -1, 0]
 
-    nextTurn = 2 if curTurn==1 else 1
-
     best = [-1, -1, -100]
     
-    [safe, losing] = getSafeLosingMoves(curTurn)
-    validMoves = safe+losing
-    for edge in validMoves:
+    # try the safe edges first; add and remove them right on the masks
+    [safe, losing] = getSafeLosingMasks(curTurn, state)
+    masks = state.masks
+    for e in maskEdges(safe) + maskEdges(losing):
+        bit = 1 << e
 
         # run minimax again
-        addEdge(edge, curTurn)
-        result = negamax(depth-1, turn, nextTurn, -color, -beta, -alpha)
-        removeEdge(edge)
+        masks[curTurn] |= bit
+        result = negamax(depth-1, turn, nextTurn, -color, -beta, -alpha, \
+            state)
+        masks[curTurn] ^= bit
         
         # update best
-        (result[0], result[1]) = edge
+        (result[0], result[1]) = EDGES[e]
         result[2] = -result[2]
         if result[2] > best[2]:
             best = result
@@ -465,11 +523,380 @@ def negamax(depth, turn, curTurn, color, alpha, beta):
     return best
 
 
-def HumanStrat(turn):
-    # Human Strategy - get user input: 2 dots that form a valid edge
+##### Transposition Table #####
+# mmpruning and negamax search the same position again every time it's
+# reached by a different move order, or w/ the dots numbered differently
+# (Sim doesn't change if we renumber the 6 dots, so a position can have
+# up to 720 copies). mmpruningTT and negamaxTT remember every searched
+# position in a transposition table, keyed by a canonical form:
+#     key = (red mask << 15) | blue mask, after renumbering the dots
+# and we use the smallest key out of all renumberings that put the dots
+# in order of their (red degree, blue degree). Any copy of the position
+# has the same dots in the same order, so it gets the same key, and we
+# usually only have to try a handful of the 720 renumberings.
+
+# every renumbering p of the dots: dot v becomes dot p[v]
+PERMUTATIONS = list(itertools.permutations(range(6)))
+PERM_INDEX = {p: i for i, p in enumerate(PERMUTATIONS)}
+
+# mask of the 5 edges at each dot
+DOT_EDGES = [sum(EDGE_BIT[v][u] for u in range(6)) for v in range(6)]
+
+# transposition table flags: the stored score is exact, or only a
+# lower bound (search was cut off by beta) or upper bound (by alpha)
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# filled in as they're needed:
+#     permCache[i] = tables for renumbering PERMUTATIONS[i] (see below)
+#     orderCache[degrees] = renumberings that sort dots w/ those degrees
+permCache = {}
+orderCache = {}
+
+# return [edgeMap, edgeUnmap, low, high] for PERMUTATIONS[i], where
+#     edgeMap[e] = the number of edge e after renumbering, edgeUnmap
+#     goes back, and low[mask & 255] | high[mask >> 8] renumbers a mask
+def permTables(i):
+    if i not in permCache:
+        p = PERMUTATIONS[i]
+        edgeMap = [EDGE_BIT[p[x1]][p[x2]].bit_length() - 1 \
+                   for (x1, x2) in EDGES]
+        edgeUnmap = [0] * len(EDGES)
+        for e in range(len(EDGES)):
+            edgeUnmap[edgeMap[e]] = e
+        low = [sum(1 << edgeMap[e] for e in LOW_EDGES[m]) \
+               for m in range(256)]
+        high = [sum(1 << edgeMap[e] for e in HIGH_EDGES[m]) \
+                for m in range(1 << (len(EDGES)-8))] # edges 8-14
+        permCache[i] = [edgeMap, edgeUnmap, low, high]
+    return permCache[i]
+
+# the renumberings (indices into PERMUTATIONS) that put the dots in
+# order of degrees[v]; dots w/ the same degrees can go in any order
+def sortingPerms(degrees):
+    if degrees not in orderCache:
+        order = sorted(range(6), key=lambda v: degrees[v])
+        groups = [list(g) for _, g in \
+                  itertools.groupby(order, key=lambda v: degrees[v])]
+        perms = []
+        for arrangement in itertools.product( \
+                *[itertools.permutations(g) for g in groups]):
+            p = [0] * 6
+            for newDot, v in enumerate(itertools.chain(*arrangement)):
+                p[v] = newDot
+            perms.append(PERM_INDEX[tuple(p)])
+        orderCache[degrees] = perms
+    return orderCache[degrees]
+
+# return (canonical key of the position, index of its renumbering)
+def canonicalKey(state):
+    [_, red, blue] = state.masks
+    degrees = tuple(8*bin(red & DOT_EDGES[v]).count('1') + \
+                    bin(blue & DOT_EDGES[v]).count('1') for v in range(6))
+    best = None
+    for i in sortingPerms(degrees):
+        [_, _, low, high] = permTables(i)
+        key = (low[red & 255] | high[red >> 8]) << 15 | \
+              low[blue & 255] | high[blue >> 8]
+        if best is None or key < best[0]:
+            best = (key, i)
+    return best
+
+# return the edge numbers to search: the table's best edge (if any)
+# first, then the safe edges, then the losing ones
+def orderedEdges(curTurn, state, ttEdge):
+    [safe, losing] = getSafeLosingMasks(curTurn, state)
+    edges = list(maskEdges(safe) + maskEdges(losing))
+    if ttEdge in edges:
+        edges.remove(ttEdge)
+        edges.insert(0, ttEdge)
+    return edges
+
+# use minimax with alpha-beta pruning and a transposition table
+def MinimaxPruningTTStrat(depth, turn, state):
+    [x1, x2, _] = mmpruningTT(depth, turn, turn, -1000, +1000, state, {})
+    return (x1,x2)
+
+# Same as mmpruning, plus:
+#     table = transposition table (dict) for this search, where
+#         table[canonical key] = [depth, score, flag, edge]
+#         and edge is the best edge's number in the canonical position
+# Scores depend on the depth left, so entries are only used at the
+# same depth (which they always are within one search)
+def mmpruningTT(depth, turn, curTurn, alpha, beta, state, table):
+
+    # return if leaf state (same as gameIsDone, straight from the masks)
+    nextTurn = 2 if curTurn==1 else 1
+    over = nextTurn if hasTriangle(state.masks[curTurn]) else 0
+    if over:
+        if over==turn:
+            score = +1+depth
+        else:
+            score = -1-depth
+        return [-1, -1, score]
+    if depth == 0:
+        return [-1, -1, 0]
+
+    # look up the position; stored edges are mapped back through the
+    # renumbering to edges of this position
+    (key, i) = canonicalKey(state)
+    [edgeMap, edgeUnmap, _, _] = permTables(i)
+    entry = table.get(key)
+    ttEdge = None
+    if entry:
+        [entryDepth, score, flag, edge] = entry
+        ttEdge = edgeUnmap[edge]
+        if entryDepth == depth:
+            (x1, x2) = EDGES[ttEdge]
+            if flag == EXACT:
+                return [x1, x2, score]
+            elif flag == LOWER:
+                alpha = max(alpha, score)
+            elif flag == UPPER:
+                beta = min(beta, score)
+            if beta <= alpha:
+                return [x1, x2, score]
+    alphaOrig, betaOrig = alpha, beta
+
+    if curTurn == turn:
+        best = [-1, -1, -100]
+    else:
+        best = [-1, -1, +100]
+    bestEdge = None
+
+    masks = state.masks
+    for e in orderedEdges(curTurn, state, ttEdge):
+        bit = 1 << e
+
+        # run minimax again
+        masks[curTurn] |= bit
+        result = mmpruningTT(depth-1, turn, nextTurn, alpha, beta, state, \
+            table)
+        masks[curTurn] ^= bit
+
+        # update best, then alpha or beta
+        (result[0], result[1]) = EDGES[e]
+        if curTurn == turn and result[2] > best[2]:
+            best, bestEdge = result, e
+        elif curTurn != turn and result[2] < best[2]:
+            best, bestEdge = result, e
+        if curTurn == turn:
+            alpha = max(alpha, best[2])
+        else:
+            beta = min(beta, best[2])
+        if beta <= alpha:
+            break
+
+    # store the result, w/ the best edge numbered as in the canonical
+    # position
+    if bestEdge is not None:
+        if best[2] <= alphaOrig:
+            flag = UPPER
+        elif best[2] >= betaOrig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        table[key] = [depth, best[2], flag, edgeMap[bestEdge]]
+    return best
 
-    global selection
+# negamax with pruning and a transposition table
+def NegamaxTTStrat(depth, turn, state):
+    [x1, x2, _] = negamaxTT(depth, turn, turn, 1, -1000, +1000, state, {})
+    return (x1,x2)
+
+# Same as negamax, plus a transposition table like mmpruningTT's. Scores
+# don't depend on the depth left, so deeper entries can be used too
+def negamaxTT(depth, turn, curTurn, color, alpha, beta, state, table):
+    nextTurn = 2 if curTurn==1 else 1
+    over = nextTurn if hasTriangle(state.masks[curTurn]) else 0
+
+    if over:
+        score = +1 if over==turn else -1
+        return [-1, -1, color * score]
+    if depth == 0:
+        return [-1, -1, 0]
+
+    # look up the position, like mmpruningTT
+    (key, i) = canonicalKey(state)
+    [edgeMap, edgeUnmap, _, _] = permTables(i)
+    entry = table.get(key)
+    ttEdge = None
+    if entry:
+        [entryDepth, score, flag, edge] = entry
+        ttEdge = edgeUnmap[edge]
+        if entryDepth >= depth:
+            (x1, x2) = EDGES[ttEdge]
+            if flag == EXACT:
+                return [x1, x2, score]
+            elif flag == LOWER:
+                alpha = max(alpha, score)
+            elif flag == UPPER:
+                beta = min(beta, score)
+            if beta <= alpha:
+                return [x1, x2, score]
+    alphaOrig, betaOrig = alpha, beta
+
+    best = [-1, -1, -100]
+    bestEdge = None
 
+    masks = state.masks
+    for e in orderedEdges(curTurn, state, ttEdge):
+        bit = 1 << e
+
+        # run minimax again
+        masks[curTurn] |= bit
+        result = negamaxTT(depth-1, turn, nextTurn, -color, -beta, -alpha, \
+            state, table)
+        masks[curTurn] ^= bit
+
+        # update best
+        (result[0], result[1]) = EDGES[e]
+        result[2] = -result[2]
+        if result[2] > best[2]:
+            best, bestEdge = result, e
+
+        # update alpha
+        alpha = max(alpha, best[2])
+        if beta <= alpha:
+            break
+
+    # store the result, like mmpruningTT
+    if bestEdge is not None:
+        if best[2] <= alphaOrig:
+            flag = UPPER
+        elif best[2] >= betaOrig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        table[key] = [depth, best[2], flag, edgeMap[bestEdge]]
+    return best
+
+
+##### Perfect-Play Table #####
+# Sim only has 1,350,022 positions where nobody has a triangle yet, so
+# we can solve all of them once and then play perfectly by looking up
+# the answer. Each position is keyed by its base-3 edge code:
+#     code = sum of getEdge(EDGES[e]) * 3^e
+# and table[code] (a signed byte) is the value for the player to move:
+# +d if they win and -d if they lose, where d is the number of plies
+# left until the loser completes a triangle (so -1 = every move loses).
+# table[code] == 0 means the code isn't a position from a game (or
+# someone already has a triangle). The table is built on first use,
+# one ply at a time from the end of the game backwards, and saved next
+# to this file; after that it's memory-mapped, so every process that
+# plays Sim shares the same 14 MB.
+
+SIM_TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'sim_table.bin')
+SIM_TABLE_SIZE = 3**len(EDGES)
+POW3 = [3**e for e in range(len(EDGES))]
+simTable = None
+
+# base-3 code of the position
+def stateCode(state):
+    code = 0
+    for turn in [1, 2]:
+        for e in maskEdges(state.masks[turn]):
+            code += turn * POW3[e]
+    return code
+
+# the player who moves next: Player 1 moves first
+def turnToMove(state):
+    red = len(maskEdges(state.masks[1]))
+    blue = len(maskEdges(state.masks[2]))
+    return 1 if red == blue else 2
+
+# value of a position from the values of its safe moves: win as soon as
+# possible, or else lose as late as possible
+def bestValue(values):
+    wins = [v for v in values if v < 0] # the opponent loses
+    if wins:
+        return 1 - max(wins)
+    return -1 - max(values)
+
+def buildSimTable():
+    table = array('b', bytes(SIM_TABLE_SIZE))
+
+    # triangle-free masks by number of edges, and their base-3 codes
+    freeMasks = [[] for _ in range(len(EDGES)+1)]
+    for mask in range(ALL_EDGES+1):
+        if not hasTriangle(mask):
+            freeMasks[len(maskEdges(mask))].append(mask)
+    ternary = {mask: sum(POW3[e] for e in maskEdges(mask)) \
+               for masks in freeMasks for mask in masks}
+
+    # work backwards from the last ply, so the positions after each
+    # move are already solved
+    for ply in range(len(EDGES)-1, -1, -1):
+        red, blue = (ply+1) // 2, ply // 2
+        turn = 1 if red == blue else 2
+        for R in freeMasks[red]:
+            codeR = ternary[R]
+            for B in freeMasks[blue]:
+                if R & B:
+                    continue
+                own = R if turn == 1 else B
+                empty = ALL_EDGES ^ (R | B)
+                safe = empty & ~LOSING_EDGES[own]
+                code = codeR + 2*ternary[B]
+                if not safe:
+                    table[code] = -1 # every move makes a triangle
+                    continue
+                table[code] = bestValue([table[code + turn*POW3[e]] \
+                                         for e in maskEdges(safe)])
+    return table
+
+# return the perfect-play table: memory-mapped from SIM_TABLE_FILE, or
+# else build it (and save it to SIM_TABLE_FILE for next time)
+def getSimTable():
+    global simTable
+    if simTable is not None:
+        return simTable
+
+    try:
+        with open(SIM_TABLE_FILE, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) != SIM_TABLE_SIZE:
+            raise ValueError("Not a Sim perfect-play table")
+        table = memoryview(data).cast('b')
+    except (OSError, ValueError):
+        print("Solving Sim... (only needed once)")
+        table = buildSimTable()
+        try:
+            with open(SIM_TABLE_FILE + '.tmp', 'wb') as f:
+                table.tofile(f)
+            os.replace(SIM_TABLE_FILE + '.tmp', SIM_TABLE_FILE)
+        except OSError:
+            pass # can't save; just build it again next time
+    simTable = table
+    return table
+
+# return [value for the player to move (see above), list of all best
+# (x1,x2) moves]
+def lookupPosition(state):
+    table = getSimTable()
+    code = stateCode(state)
+    turn = turnToMove(state)
+    [safe, losing] = getSafeLosingMasks(turn, state)
+    if not safe:
+        return [-1, [EDGES[e] for e in maskEdges(losing)]]
+    values = {e: table[code + turn*POW3[e]] for e in maskEdges(safe)}
+    value = bestValue(values.values())
+    bestMoves = [EDGES[e] for e in values if bestValue([values[e]]) == value]
+    return [value, bestMoves]
+
+# play perfectly by looking up the best moves in the table
+def PerfectStrat(turn, state):
+    if turnToMove(state) != turn or fullGameIsDone(state):
+        # not a position from a normal game
+        return NegamaxStrat(8, turn, state)
+    [_, bestMoves] = lookupPosition(state)
+    return random.choice(bestMoves)
+
+
+def HumanStrat(turn, state):
+    # Human Strategy - get user input: 2 dots that form a valid edge
+
+    selection = state.selection
     while len(selection) < 2:
         
         x,y = pg.mouse.get_pos()
@@ -493,32 +920,44 @@ def HumanStrat(turn):
                     break
         
         # redraw the dots
-        draw(turn)
+        draw(turn, state)
     
     x1x2 = (selection[0], selection[1])
-    selection = []
+    selection.clear()
     return x1x2
 
 
-def Player1Strategy():
-    # return RandomStrat(1)
-    # return OffensiveStrat(1)
-    # return DefensiveStrat(1)
-    # return MinimaxPruningStrat(8, 1)
-    # return NegamaxStrat(8, 1)
-    return HumanStrat(1)
-
-def Player2Strategy():
-    # return RandomStrat(2)
-    # return OffensiveStrat(2)
-    # return DefensiveStrat(2)
-    # return MinimaxPruningStrat(8, 2)
-    # return NegamaxStrat(8, 2)
-    return HumanStrat(2)
+def Player1Strategy(state):
+    # return RandomStrat(1, state)
+    # return OffensiveStrat(1, state)
+    # return DefensiveStrat(1, state)
+    # return MinimaxPruningStrat(8, 1, state)
+    # return NegamaxStrat(8, 1, state)
+    # return MinimaxPruningTTStrat(8, 1, state)
+    # return NegamaxTTStrat(8, 1, state)
+    # return PerfectStrat(1, state)
+    return HumanStrat(1, state)
+
+def Player2Strategy(state):
+    # return RandomStrat(2, state)
+    # return OffensiveStrat(2, state)
+    # return DefensiveStrat(2, state)
+    # return MinimaxPruningStrat(8, 2, state)
+    # return NegamaxStrat(8, 2, state)
+    # return MinimaxPruningTTStrat(8, 2, state)
+    # return NegamaxTTStrat(8, 2, state)
+    # return PerfectStrat(2, state)
+    return HumanStrat(2, state)
 
 
 ##### Main Function #####
 def main():
+    global screen
+
+    # Initialize pygame and set up the drawing window
+    pg.init()
+    screen = pg.display.set_mode([500, 500])
+
     gen_dots()
     # points can be represented in clockwise order
     # from 0 to 5, in the following fashion:
@@ -530,8 +969,9 @@ def main():
     #        2     1
 
     # draw the current Sim board
+    state = SimState()
     turn = 1
-    draw(turn)
+    draw(turn, state)
 
     # Run until the user asks to quit
     running = True
@@ -545,29 +985,25 @@ def main():
         # Prompt for player's new edge
         print("Player %d, select a new edge" % turn)
         if turn == 1:
-            (x1, x2) = Player1Strategy()
+            (x1, x2) = Player1Strategy(state)
         elif turn == 2:
-            (x1, x2) = Player2Strategy()
+            (x1, x2) = Player2Strategy(state)
         edge = (min(x1,x2), max(x1,x2)) # remember our ordering convention!
 
         # Check if valid location
-        if not edge_is_valid(edge):
+        if not edge_is_valid(edge, state):
             print("You cannot take this edge. Try again.")
             continue
 
         # Update board and redraw
-        addEdge(edge, turn)
-        if turn == 1:
-            red_edges.append(edge)
-        else:
-            blue_edges.append(edge)
-        draw(turn)
+        state.play(edge, turn)
+        draw(turn, state)
         
         # Debugging - study the board step by step:
-        # printBoard()
+        # printBoard(state)
         # time.sleep(1)
 
-        result = gameIsDone(turn)
+        result = gameIsDone(turn, state)
         if result:
             print("Player %d is the winner!" % result)
             time.sleep(3) # change to adjust observation times
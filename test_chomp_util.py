@@ -0,0 +1,41 @@
+import os
+import pytest
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+from chomp_util import BoardFunctions
+
+# the top row counts too: the game isn't over while it has squares
+def test_game_not_over_with_squares_in_top_row():
+    matrix = [[1,1,0],
+              [0,0,0],
+              [1,0,0]]
+    B = BoardFunctions(matrix)
+    board = B.makeBoard(matrix)
+    assert not B.gameIsOver(board)
+
+    board = B.updateBoard(board, (1,3)) # take the whole top row
+    assert B.gameIsOver(board)
+
+def test_game_not_over_on_two_row_board():
+    B = BoardFunctions((2,2))
+    board = B.updateBoard(B.makeBoard((2,2)), (2,1))
+    assert not B.gameIsOver(board) # (1,2) is still there
+
+# the vectorized children are the same boards as updateBoard makes
+def test_get_children_matches_update_board():
+    pytest.importorskip('numpy')
+    B = BoardFunctions((9,6))
+    board = B.makeBoard((9,6))
+    board = B.updateBoard(board, (5,3))
+    board = B.updateBoard(board, (8,1))
+
+    moves, children = B.getChildren(board)
+    assert sorted(tuple(int(v) for v in move) for move in moves) == \
+        sorted(B.getValidMoves(board))
+    for (x, y), child in zip(moves, children):
+        expected = B.updateBoard(board, (int(x), int(y)))
+        assert B.fromArray(child) == expected
+    assert list(B.gamesAreOver(children)) == \
+        [B.gameIsOver(B.fromArray(child)) for child in children]
+    assert list(B.countBoards(children)) == \
+        [B.fromArray(child).getCount() for child in children]
+    assert B.fromArray(B.toArray(board)) == board
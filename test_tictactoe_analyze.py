@@ -0,0 +1,29 @@
+import os
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import pytest
+import tictactoe_analyze, tictactoe_solution
+from tictactoe_analyze import analyzePosition
+
+# build the perfect-play table in a temporary folder, not the source tree
+@pytest.fixture(autouse=True)
+def tableFile(tmp_path, monkeypatch):
+    monkeypatch.setattr(tictactoe_solution, 'TABLE_FILE', \
+                        str(tmp_path / 'tictactoe_table.bin'))
+    monkeypatch.setattr(tictactoe_solution, 'perfectTable', None)
+
+def clearTables():
+    for table in tictactoe_analyze.solverTables.values():
+        table.clear()
+
+# off-turn positions aren't in the perfect-play table, so they're solved
+# w/ the transposition tables; the answer mustn't depend on what was
+# solved before it for the other player
+def test_answer_does_not_depend_on_other_turn():
+    position = {'board': [[0,1,0],[0,0,0],[1,0,0]], 'turn': 2}
+    clearTables()
+    fresh = analyzePosition(position)
+    assert fresh['value'] == -1
+
+    clearTables()
+    analyzePosition({'board': [[0,0,2],[0,0,0],[1,0,1]], 'turn': 1})
+    assert analyzePosition(position) == fresh
@@ -0,0 +1,242 @@
+'''
+This tic-tac-toe position analyzer was created for the purposes of
+Project Ignite 2021: AI-m of the Game. Please do not redistribute
+publicly without permission.
+
+Read lots of tic-tac-toe positions (eg. from recorded games) from a
+file, and write down for each one the value for the player to move
+(+1 win, 0 tie, -1 loss with perfect play), all of the best moves and,
+if the move that was actually played is given, whether it was one of
+them. Results are written as JSON lines, in the same order as the
+input, while the rest of the file is still being read.
+
+Input formats:
+    text:  one position per line: 9 squares row by row from the top
+           ('O' or '1' for Player 1, 'X' or '2' for Player 2, and '.',
+           '-' or '0' for empty; '/' and '|' are ignored), optionally
+           followed by the move played as x,y. Lines starting with '#'
+           are skipped.
+               Eg. XO./.X./..O 3,2
+    jsonl: one JSON object per line w/ "board" (a string as above, or
+           a 3x3 list of 0/1/2), and optionally "id", "turn" (1 or 2;
+           found from the pieces if missing) and "move" ([x, y]).
+               Eg. {"id": 7, "board": "XO..X...O", "move": [3, 2]}
+
+Positions are looked up in the perfect-play table (see PerfectStrat).
+Positions that aren't in it (eg. the wrong player to move) are solved
+with mmpruningTT instead, and each worker keeps its transposition table.
+Only a few batches are in flight at once, so memory stays the same no
+matter how big the input is.
+
+Eg. python tictactoe_analyze.py games.txt --out results.jsonl --workers 4
+'''
+
+import argparse, json, multiprocessing, os, sys, time
+from collections import deque
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1') # stay quiet
+from tictactoe_solution import getTable, lookupPosition, boardCode, \
+    turnToMove, gameIsDone, getValidMoves, updateBoard, mmpruningTT
+
+SQUARES = {'O': 1, 'o': 1, '1': 1, 'X': 2, 'x': 2, '2': 2, \
+           '.': 0, '-': 0, '_': 0, '0': 0}
+DEFAULT_BATCH = 1000 # positions per batch sent to a worker
+
+##### Parsing #####
+
+# board string (see above) to a 3x3 board
+def parseBoard(text):
+    squares = [c for c in text if c not in '/|']
+    if len(squares) != 9 or any(c not in SQUARES for c in squares):
+        raise ValueError("board must have 9 squares of O, X or .")
+    return [[SQUARES[c] for c in squares[3*i:3*i+3]] for i in range(3)]
+
+def parseMove(move):
+    (x, y) = (int(v) for v in move)
+    if not (1 <= x <= 3 and 1 <= y <= 3):
+        raise ValueError("move must be in 1-3, 1-3")
+    return (x, y)
+
+# one input line to a position dict, or None if the line is skipped
+def parseLine(line, fmt):
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if fmt == 'jsonl':
+        record = json.loads(line)
+        board = record['board']
+        if isinstance(board, str):
+            board = parseBoard(board)
+        elif len(board) != 3 or any(len(row) != 3 or \
+                any(B not in (0, 1, 2) for B in row) for row in board):
+            raise ValueError("board must be 3 rows of 3 squares (0/1/2)")
+        position = {'board': [list(row) for row in board]}
+        if 'id' in record:
+            position['id'] = record['id']
+        if record.get('turn') is not None:
+            position['turn'] = int(record['turn'])
+        if record.get('move') is not None:
+            position['move'] = parseMove(record['move'])
+        return position
+
+    tokens = line.split()
+    position = {'board': parseBoard(tokens[0])}
+    if len(tokens) >= 2:
+        position['move'] = parseMove(tokens[1].strip('()').split(','))
+    return position
+
+# read the file in batches of [(line number, text)]
+def readBatches(f, batchSize):
+    batch = []
+    for number, line in enumerate(f, 1):
+        batch.append((number, line))
+        if len(batch) >= batchSize:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+##### Analysis #####
+
+# the transposition tables of this process, shared by every position
+# that isn't in the perfect-play table. mmpruningTT's scores are for
+# the root player, so each root turn needs its own table
+solverTables = {1: {}, 2: {}}
+
+# [value for 'turn', list of all best (x,y) moves, {move: value}]
+def solve(board, turn):
+    if turn == turnToMove(board) and getTable()[boardCode(board)]:
+        [value, bestMoves] = lookupPosition(board)
+        return value, bestMoves, None
+
+    nextTurn = 2 if turn==1 else 1
+    values = {}
+    for move in getValidMoves(board):
+        newBoard = updateBoard(move, turn, board)
+        values[move] = mmpruningTT(10, turn, nextTurn, -100, +100, \
+            newBoard, solverTables[turn])[2]
+    best = max(values.values())
+    return best, [move for move in values if values[move] == best], values
+
+def analyzePosition(position):
+    board = position['board']
+    turn = position.get('turn') or turnToMove(board)
+    if turn not in (1, 2):
+        raise ValueError("turn must be 1 or 2")
+    result = {'board': ''.join('.OX'[B] for row in board for B in row), \
+              'turn': turn}
+    result['result'] = gameIsDone(board)
+    if result['result']:
+        return result
+
+    value, bestMoves, values = solve(board, turn)
+    result['value'] = value
+    result['bestMoves'] = sorted(bestMoves)
+
+    if 'move' in position:
+        move = position['move']
+        result['move'] = move
+        if move not in getValidMoves(board):
+            result['error'] = "move is not a valid move"
+        else:
+            if values is None:
+                # value of the move = minus the value for the opponent
+                nextTurn = 2 if turn==1 else 1
+                newBoard = updateBoard(move, turn, board)
+                if gameIsDone(newBoard):
+                    done = gameIsDone(newBoard)
+                    moveValue = 0 if done == 3 else 1
+                else:
+                    moveValue = -solve(newBoard, nextTurn)[0]
+            else:
+                moveValue = values[move]
+            result['moveValue'] = moveValue
+            result['optimal'] = moveValue == value
+    return result
+
+# analyze one batch of [(line number, text)]; return the result of
+# every line that wasn't skipped
+def analyzeBatch(batch, fmt):
+    results = []
+    for (number, line) in batch:
+        try:
+            position = parseLine(line, fmt)
+            if position is None:
+                continue
+            result = analyzePosition(position)
+            if 'id' in position:
+                result['id'] = position['id']
+        except (ValueError, KeyError, TypeError) as e:
+            result = {'error': str(e)}
+        result['line'] = number
+        results.append(result)
+    return results
+
+# load the perfect-play table once per worker
+def initWorker():
+    getTable()
+
+# analyze every position in f and write the results to out as they're
+# done; at most 2 batches per worker are in memory at once.
+# Return (positions, errors)
+def analyzeFile(f, out, fmt, workers=1, batchSize=DEFAULT_BATCH):
+    counts = [0, 0]
+    def write(results):
+        for result in results:
+            out.write(json.dumps(result) + '\n')
+            counts[0] += 1
+            counts[1] += 'error' in result
+        out.flush()
+
+    getTable() # build (and save) the table before the workers need it
+    if workers <= 1:
+        for batch in readBatches(f, batchSize):
+            write(analyzeBatch(batch, fmt))
+        return tuple(counts)
+
+    pending = deque()
+    with multiprocessing.Pool(workers, initWorker) as pool:
+        for batch in readBatches(f, batchSize):
+            pending.append(pool.apply_async(analyzeBatch, (batch, fmt)))
+            if len(pending) >= 2*workers:
+                write(pending.popleft().get())
+        while pending:
+            write(pending.popleft().get())
+    return tuple(counts)
+
+
+##### Main Function #####
+def main():
+    parser = argparse.ArgumentParser(description= \
+        "Analyze tic-tac-toe positions from a file")
+    parser.add_argument('input', help="positions file ('-' for stdin)")
+    parser.add_argument('--format', choices=['text', 'jsonl'],
+                        help="input format (default: from the extension)")
+    parser.add_argument('--out', default='-',
+                        help="JSON lines output file (default: stdout)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes")
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH,
+                        help="positions per batch")
+    args = parser.parse_args()
+
+    fmt = args.format
+    if fmt is None:
+        fmt = 'jsonl' if args.input.endswith(('.jsonl', '.json')) \
+            else 'text'
+
+    start = time.perf_counter()
+    f = sys.stdin if args.input == '-' else open(args.input)
+    out = sys.stdout if args.out == '-' else open(args.out, 'w')
+    try:
+        positions, errors = analyzeFile(f, out, fmt, args.workers, \
+            args.batch)
+    finally:
+        if f is not sys.stdin: f.close()
+        if out is not sys.stdout: out.close()
+    elapsed = time.perf_counter() - start
+    print("Analyzed %d positions (%d errors) in %.2fs (%.0f positions/s)" \
+        % (positions, errors, elapsed, positions / max(elapsed, 1e-9)), \
+        file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
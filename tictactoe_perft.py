@@ -0,0 +1,152 @@
+'''
+This tic-tac-toe perft benchmark was created for the purposes of Project
+Ignite 2021: AI-m of the Game. Please do not redistribute publicly
+without permission.
+
+Count every position and every finished game of Tic-Tac-Toe (or any
+m,n,k-game) by playing out all possible move orders with getValidMoves,
+updateBoard and gameIsDone, and report how many positions were visited
+per second. A game stops as soon as someone wins, so 3x3 has 255,168
+different games (not 9! = 362,880). Since these totals are well known,
+the benchmark also checks that the game tools are still correct.
+
+Eg. python tictactoe_perft.py --board 3x3x3 --workers 4
+'''
+
+import argparse, multiprocessing, os, time
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1') # stay quiet
+from tictactoe_solution import MNKBoard, gameIsDone, getValidMoves, \
+    updateBoard, makeMove, unmakeMove
+
+# (m, n, k) -> positions at every ply, and games won by player 1,
+# won by player 2 and tied
+KNOWN_TOTALS = {
+    (3, 3, 3): {
+        'positions': [1, 9, 72, 504, 3024, 15120, 54720, 148176, \
+                      200448, 127872],
+        'results': [131184, 77904, 46080],
+    },
+}
+
+# count the positions under board (which is 'ply' moves into the game)
+# in counts[ply], and the finished games in results[winner-1]
+def perft(board, turn, ply, depth, counts, results):
+    counts[ply] += 1
+    result = gameIsDone(board)
+    if result:
+        results[result-1] += 1
+        return
+    if ply == depth:
+        return
+    nextTurn = 2 if turn==1 else 1
+    for move in getValidMoves(board):
+        perft(updateBoard(move, turn, board), nextTurn, ply+1, depth, \
+            counts, results)
+
+# same as perft, but makes and unmakes the moves on a single board
+def perftInPlace(board, turn, ply, depth, counts, results):
+    counts[ply] += 1
+    result = gameIsDone(board)
+    if result:
+        results[result-1] += 1
+        return
+    if ply == depth:
+        return
+    nextTurn = 2 if turn==1 else 1
+    for move in getValidMoves(board):
+        undo = makeMove(move, turn, board)
+        perftInPlace(board, nextTurn, ply+1, depth, counts, results)
+        unmakeMove(move, board, undo)
+
+# count everything after Player 1's first move at 'first'
+def perftFirstMove(m, n, k, depth, first, inPlace):
+    board = MNKBoard(m, n, k)
+    board = updateBoard(first, 1, board)
+    counts = [0] * (depth+1)
+    results = [0, 0, 0]
+    search = perftInPlace if inPlace else perft
+    search(board, 2, 1, depth, counts, results)
+    return counts, results
+
+# count up to 'depth' moves, splitting the first moves over 'workers'
+# processes; return the counts, the results and the time taken
+def runPerft(m, n, k, depth=None, workers=1, inPlace=False):
+    if depth is None:
+        depth = m*n
+    start = time.perf_counter()
+    counts = [1] + [0]*depth # the empty board
+    results = [0, 0, 0]
+    if depth > 0:
+        args = [(m, n, k, depth, move, inPlace) for move in \
+                getValidMoves(MNKBoard(m, n, k))]
+        if workers > 1:
+            with multiprocessing.Pool(workers) as pool:
+                outputs = pool.starmap(perftFirstMove, args)
+        else:
+            outputs = [perftFirstMove(*arg) for arg in args]
+
+        # add up the results of every first move
+        for (moveCounts, moveResults) in outputs:
+            for ply in range(1, depth+1):
+                counts[ply] += moveCounts[ply]
+            for i in range(3):
+                results[i] += moveResults[i]
+    return counts, results, time.perf_counter() - start
+
+# compare with KNOWN_TOTALS: True if they match, False if they don't,
+# or None if there's nothing to compare with
+def checkTotals(m, n, k, depth, counts, results):
+    known = KNOWN_TOTALS.get((m, n, k))
+    if not known:
+        return None
+    if counts != known['positions'][:depth+1]:
+        return False
+    if depth >= m*n and results != known['results']:
+        return False
+    return True
+
+def printPerft(m, n, k, counts, results, elapsed):
+    nodes = sum(counts)
+    print("%dx%d, %d in a row: %d plies in %.2fs (%.0f nodes/s)" % \
+        (m, n, k, len(counts)-1, elapsed, nodes / elapsed))
+    print("ply  positions")
+    for ply, count in enumerate(counts):
+        print("%3d  %d" % (ply, count))
+    print("%d positions, %d finished games (Player 1 wins %d, " \
+        "Player 2 wins %d, ties %d)" % (nodes, sum(results), *results))
+
+
+##### Main Function #####
+def parseBoard(text):
+    m, n, k = text.lower().split('x')
+    return (int(m), int(n), int(k))
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe perft")
+    parser.add_argument('--board', type=parseBoard, default=(3,3,3),
+                        help="MxNxK: columns, rows, in a row (default: 3x3x3)")
+    parser.add_argument('--depth', type=int, default=None,
+                        help="plies to search (default: all)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes to split the first moves over")
+    parser.add_argument('--inplace', action='store_true',
+                        help="make/unmake moves instead of copying boards")
+    args = parser.parse_args()
+
+    m, n, k = args.board
+    depth = m*n if args.depth is None else min(args.depth, m*n)
+    counts, results, elapsed = runPerft(m, n, k, depth, args.workers, \
+        args.inplace)
+    printPerft(m, n, k, counts, results, elapsed)
+
+    check = checkTotals(m, n, k, depth, counts, results)
+    if check is None:
+        print("No known totals for this board")
+    elif check:
+        print("Matches the known totals")
+    else:
+        print("DOES NOT match the known totals!")
+        exit(1)
+
+if __name__ == "__main__":
+    main()
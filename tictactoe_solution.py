@@ -27,8 +27,10 @@ diagonal of 3 of his pieces is the winner.
 '''
 
 import pygame as pg
-import random, time
+import json, math, os, random, time
+from array import array
 from copy import deepcopy
+from mcts_util import UCTNode
 # deepcopy is very important for creating different instances
 # of the board. Otherwise, changing newBoard would change board!
 
@@ -40,68 +42,61 @@ colors = [black, blue, red]
 
 ##### GUI Tools #####
 
-def drawO(x,y):
-    pg.draw.circle(screen, blue, (y*100 + 50, x*100 + 50), 40, 15)
-def drawX(x,y):
-    p1 = (y*100 + 25,x*100 + 20)
-    p2 = (y*100 + 75,x*100 + 20)
-    p3 = (y*100 + 25,x*100 + 80)
-    p4 = (y*100 + 75,x*100 + 80)
-    pg.draw.line(screen, red, p1, p4, 20)
-    pg.draw.line(screen, red, p2, p3, 20)
+# size of each square (in pixels), so that big boards fit on the screen
+def squareSize(board):
+    return min(100, 800 // max(len(board), len(board[0])))
+
+def drawO(x,y,size=100):
+    pg.draw.circle(screen, blue, (y*size + size//2, x*size + size//2), \
+        size*4//10, size*15//100)
+def drawX(x,y,size=100):
+    p1 = (y*size + size//4,   x*size + size//5)
+    p2 = (y*size + size*3//4, x*size + size//5)
+    p3 = (y*size + size//4,   x*size + size*4//5)
+    p4 = (y*size + size*3//4, x*size + size*4//5)
+    pg.draw.line(screen, red, p1, p4, size//5)
+    pg.draw.line(screen, red, p2, p3, size//5)
 
 def drawBoard(board):
+    n, m = len(board), len(board[0])
+    size = squareSize(board)
+
     # draw background
     screen.fill(white)
     
     # draw lines
-    pg.draw.line(screen, black, (100, 0), (100, 300), 10)
-    pg.draw.line(screen, black, (200, 0), (200, 300), 10)
-    pg.draw.line(screen, black, (0, 100), (300, 100), 10)
-    pg.draw.line(screen, black, (0, 200), (300, 200), 10)
+    for i in range(1, m):
+        pg.draw.line(screen, black, (i*size, 0), (i*size, n*size), size//10)
+    for i in range(1, n):
+        pg.draw.line(screen, black, (0, i*size), (m*size, i*size), size//10)
     
     # draw pieces
-    for x in range(3):
-        for y in range(3):
+    for x in range(n):
+        for y in range(m):
             B = board[x][y]
-            if B==1:   drawO(x,y)
-            elif B==2: drawX(x,y)
+            if B==1:   drawO(x,y,size)
+            elif B==2: drawX(x,y,size)
     
-    # check for 3-in-a-row
-    for i in range(3):
-        # check rows
-        piece = board[i][0]
-        if piece != 0 and piece == board[i][1] \
-                      and piece == board[i][2]:
-            pg.draw.line(screen, colors[piece], \
-                (0, i*100 + 50), (300, i*100 + 50), 15)
-        
-        # check columns
-        piece = board[0][i]
-        if piece != 0 and piece == board[1][i] \
-                      and piece == board[2][i]:
-            pg.draw.line(screen, colors[piece], \
-                (i*100 + 50,0), (i*100 + 50, 300), 15)
-
-    # check diagonals
-    piece = board[1][1]
-    if piece != 0 and piece == board[0][0] \
-                  and piece == board[2][2]:
-        pg.draw.line(screen, colors[piece], \
-                (0,0), (300,300), 20)
-    if piece != 0 and piece == board[0][2] \
-                  and piece == board[2][0]:
-        pg.draw.line(screen, colors[piece], \
-                (0,300), (300,0), 20)
+    # check for k-in-a-row, and draw a line through each (from edge to
+    # edge of its end squares)
+    k = board.k if isinstance(board, MNKBoard) else 3
+    for (piece, (x1, y1), (x2, y2)) in findLines(board, k):
+        dx, dy = (x2 > x1) - (x2 < x1), (y2 > y1) - (y2 < y1)
+        start = (y1*size + size//2 - dy*size//2, \
+                 x1*size + size//2 - dx*size//2)
+        end = (y2*size + size//2 + dy*size//2, \
+               x2*size + size//2 + dx*size//2)
+        width = size//5 if dx and dy else size*15//100 # diagonal: wider
+        pg.draw.line(screen, colors[piece], start, end, width)
 
     # flip (ie. update the board)
     pg.display.flip()
 
 def printBoard(board):
-    TableTB = "|-----------|"
+    TableTB = "|" + "-"*(4*len(board[0])-1) + "|"
     print(TableTB)
-    for x in range(3):
-        for y in range(3):
+    for x in range(len(board)):
+        for y in range(len(board[0])):
             print("|", end='')
             B = board[x][y]
             symbol = " X " if B==2 else " O " if B==1 else "   "
@@ -114,6 +109,9 @@ def printBoard(board):
 # return either the piece (1 or 2) of the winning player,
 # 0 if game is still ongoing, or 3 if it's a tie
 def gameIsDone(board):
+    if isinstance(board, MNKBoard):
+        return board.result()
+
     for i in range(3):
         # check rows
         piece = board[i][0]
@@ -146,21 +144,22 @@ def gameIsDone(board):
 # given (x,y) (in terms of 2D coordinate grid),
 # convert to coresponding (xb, yb), where
 # board[xb][yb] is the corresponding square
+# (n = number of rows of the board)
 #          (x,y)                  (xb,yb)
 #    (1,3) (2,3) (3,3)       (0,0) (0,1) (0,2)
 #    (1,2) (2,2) (3,2)  -->  (1,0) (1,1) (1,2)
 #    (1,1) (2,1) (3,1)       (2,0) (2,1) (2,2)
-def xy_to_board(xy):
+def xy_to_board(xy, n=3):
     (x, y) = xy
-    return (3-y, x-1)
-def board_to_xy(xbyb):
+    return (n-y, x-1)
+def board_to_xy(xbyb, n=3):
     (xb, yb) = xbyb
-    return (yb+1, 3-xb)
+    return (yb+1, n-xb)
 
 # given (x,y) (NOT (xb,yb)), simply check if xy is open
 def xy_is_valid(xy, board):
-    (xb, yb) = xy_to_board(xy)
-    if xb < 0 or xb > 2 or yb < 0 or yb > 2:
+    (xb, yb) = xy_to_board(xy, len(board))
+    if xb < 0 or xb >= len(board) or yb < 0 or yb >= len(board[0]):
         return False
     if board[xb][yb] != 0:
         return False
@@ -169,8 +168,8 @@ def xy_is_valid(xy, board):
 # return list of all legal (x,y) moves on the board
 def getValidMoves(board):
     validMoves = []
-    for x in range(1,4):
-        for y in range(1,4):
+    for x in range(1,len(board[0])+1):
+        for y in range(1,len(board)+1):
             if xy_is_valid((x,y), board):
                 validMoves.append((x,y))
     return validMoves
@@ -178,11 +177,178 @@ def getValidMoves(board):
 # return a new board after Player 'turn' placing their piece at (x,y)
 def updateBoard(xy, turn, board):
     assert xy_is_valid(xy, board)
-    (xb, yb) = xy_to_board(xy)
+    (xb, yb) = xy_to_board(xy, len(board))
     newBoard = deepcopy(board)
-    newBoard[xb][yb] = turn
+    if isinstance(newBoard, MNKBoard):
+        newBoard.place(xb, yb, turn)
+    else:
+        newBoard[xb][yb] = turn
     return newBoard
 
+# Player 'turn' places their piece at (x,y) on the board itself (no
+# copy!); return what unmakeMove needs to take it back
+def makeMove(xy, turn, board):
+    (xb, yb) = xy_to_board(xy, len(board))
+    if isinstance(board, MNKBoard):
+        lastMove = board.last
+        board.place(xb, yb, turn)
+        return lastMove
+    board[xb][yb] = turn
+    return None
+
+# take back the piece at (x,y) that makeMove placed
+def unmakeMove(xy, board, undo):
+    (xb, yb) = xy_to_board(xy, len(board))
+    if isinstance(board, MNKBoard):
+        board.unplace(xb, yb, undo)
+    else:
+        board[xb][yb] = 0
+
+##### m,n,k-Games #####
+# Tic-Tac-Toe is the 3,3,3-game: on a board w/ m columns and n rows,
+# the first player to get k in a row wins. Eg. 4,4,4 or 7,7,5, or
+# 15,15,5 (gomoku). MNKBoard works w/ all the Game Tools above (and so
+# w/ minimax and mmpruning). Since only the last piece placed can make
+# a new line, gameIsDone only checks the 4 lines through it, which is
+# O(k) instead of scanning the whole board
+
+# directions of a line: right, down, down-right, down-left
+DIRECTIONS = [(0,1), (1,0), (1,1), (1,-1)]
+
+# return (length, first square, last square) of the line of equal
+# pieces through board[xb][yb] in direction (dx,dy)
+def lineThrough(board, xb, yb, dx, dy):
+    n, m = len(board), len(board[0])
+    piece = board[xb][yb]
+    (x1, y1) = (xb, yb)
+    while 0 <= x1-dx < n and 0 <= y1-dy < m and \
+            board[x1-dx][y1-dy] == piece:
+        (x1, y1) = (x1-dx, y1-dy)
+    (x2, y2) = (xb, yb)
+    while 0 <= x2+dx < n and 0 <= y2+dy < m and \
+            board[x2+dx][y2+dy] == piece:
+        (x2, y2) = (x2+dx, y2+dy)
+    return (max(abs(x2-x1), abs(y2-y1)) + 1, (x1, y1), (x2, y2))
+
+# scan the whole board for lines of at least k; return a list of
+# (piece, first square, last square) of every line
+def findLines(board, k):
+    lines = []
+    for xb in range(len(board)):
+        for yb in range(len(board[0])):
+            if board[xb][yb] == 0:
+                continue
+            for (dx, dy) in DIRECTIONS:
+                (length, first, last) = lineThrough(board, xb, yb, dx, dy)
+                line = (board[xb][yb], first, last)
+                if length >= k and line not in lines:
+                    lines.append(line)
+    return lines
+
+# list of n rows (each a list of m squares), that also knows k, the
+# last square a piece was placed on and how many squares are empty
+class MNKBoard(list):
+    def __init__(self, m, n, k, rows=None):
+        if rows is None:
+            rows = [[0]*m for _ in range(n)]
+        list.__init__(self, [list(row) for row in rows])
+        self.m, self.n, self.k = m, n, k
+        self.last = None # (xb, yb) of the last piece placed, if known
+        self.empty = sum(row.count(0) for row in self)
+
+    def __deepcopy__(self, memo):
+        newBoard = MNKBoard(self.m, self.n, self.k, self)
+        newBoard.last = self.last
+        return newBoard
+
+    # put turn's piece on board[xb][yb]
+    def place(self, xb, yb, turn):
+        self[xb][yb] = turn
+        self.last = (xb, yb)
+        self.empty -= 1
+
+    # take the piece off board[xb][yb]; last = the last square before it
+    def unplace(self, xb, yb, last):
+        self[xb][yb] = 0
+        self.last = last
+        self.empty += 1
+
+    # same as gameIsDone: winner (1 or 2), 0 if ongoing, or 3 if tie
+    def result(self):
+        if self.last is None: # don't know the last move; check everything
+            lines = findLines(self, self.k)
+            if lines:
+                return lines[0][0]
+        else:
+            (xb, yb) = self.last
+            for (dx, dy) in DIRECTIONS:
+                if lineThrough(self, xb, yb, dx, dy)[0] >= self.k:
+                    return self[xb][yb]
+        return 3 if self.empty == 0 else 0
+
+##### Search Statistics #####
+# How much work did a search do? Pass a SearchStats to any of the
+# minimax strategies (eg. MinimaxStrat(10, 1, board, stats)) and it
+# counts, for every move:
+#     nodes = positions visited
+#     leaves = positions scored w/o searching deeper (game over or depth 0)
+#     cutoffs = times alpha-beta stopped searching a position early
+#     ttHits = transposition table entries that were used
+#     depth = how many moves ahead the search looked
+#     seconds = time spent choosing the move
+
+STAT_NAMES = ['nodes', 'leaves', 'cutoffs', 'ttHits', 'depth']
+
+class SearchStats:
+    def __init__(self):
+        self.moves = [] # one record per move that was played
+        self.startMove()
+
+    # reset the counters before a player picks their move
+    def startMove(self):
+        for name in STAT_NAMES:
+            setattr(self, name, 0)
+        self.start = time.perf_counter()
+
+    # searched 'depth' moves ahead from board (or until it's full)
+    def setDepth(self, depth, board):
+        self.depth = min(depth, len(getValidMoves(board)))
+
+    # player 'turn' played (x,y); save the counters of that move
+    def endMove(self, turn, xy):
+        record = {'turn': turn, 'move': list(xy)}
+        for name in STAT_NAMES:
+            record[name] = getattr(self, name)
+        record['seconds'] = time.perf_counter() - self.start
+        self.moves.append(record)
+
+    # the counters added up over all of player 'turn''s moves
+    def totals(self, turn):
+        records = [r for r in self.moves if r['turn'] == turn]
+        total = {'turn': turn, 'moves': len(records)}
+        for name in STAT_NAMES + ['seconds']:
+            total[name] = sum(r[name] for r in records)
+        total['depth'] = max([r['depth'] for r in records], default=0)
+        return total
+
+    def printSummary(self):
+        for turn in [1, 2]:
+            t = self.totals(turn)
+            print("Player %d: %d moves, %d nodes, %d leaves, %d cutoffs, " \
+                  "%d TT hits, depth %d, %.3fs" % (turn, t['moves'], \
+                  t['nodes'], t['leaves'], t['cutoffs'], t['ttHits'], \
+                  t['depth'], t['seconds']))
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump({'moves': self.moves, \
+                       'totals': [self.totals(1), self.totals(2)]}, \
+                      f, indent=2)
+
+# the SearchStats that main() collects for Player1/2Strategy, if any
+stats = None
+
+
 ##### Player 1's and 2's Strategies #####
 # turn = current turn (1 or 2)
 # board = current Tic-Tac-Toe board
@@ -213,8 +379,9 @@ def BuildBlockStrat(turn, board):
 
 
 # use simple minimax (no pruning) up to depth 'depth'
-def MinimaxStrat(depth, turn, board):
-    [x, y, _] = minimax(depth, turn, turn, board)
+def MinimaxStrat(depth, turn, board, stats=None):
+    if stats: stats.setDepth(depth, board)
+    [x, y, _] = minimax(depth, turn, turn, board, stats)
     return (x,y)
 
 # Inputs:
@@ -222,12 +389,15 @@ def MinimaxStrat(depth, turn, board):
 #     turn = turn of the player who called MinimaxStrat
 #     curTurn = turn of the current minimax node
 #     board = current board
+#     stats = SearchStats to count in, or None
 # Outputs:
 #     best = [best x, best y, score after reaching (best x, best y)]
-def minimax(depth, turn, curTurn, board):
+def minimax(depth, turn, curTurn, board, stats=None):
+    if stats: stats.nodes += 1
     
     # if we reached an end state, return 0 (end of depth or
     # a tie), +1 (turn wins), or -1 (turn loses)
+    if stats and (depth == 0 or gameIsDone(board)): stats.leaves += 1
     if gameIsDone(board):
         if gameIsDone(board) == 3:
             score = 0
@@ -252,7 +422,7 @@ def minimax(depth, turn, curTurn, board):
         newBoard = updateBoard((x,y), curTurn, board)
         nextTurn = 2 if curTurn==1 else 1
         # run minimax again with smaller depth, next turn, and updated board
-        move_result = minimax(depth-1, turn, nextTurn, newBoard)
+        move_result = minimax(depth-1, turn, nextTurn, newBoard, stats)
         
         move_result[0], move_result[1] = x, y
         if curTurn == turn: # we want to maximize best
@@ -264,8 +434,9 @@ def minimax(depth, turn, curTurn, board):
     return best
 
 # use minimax with alpha-beta pruning up to depth 'depth'
-def MinimaxPruningStrat(depth, turn, board):
-    [x, y, _] = mmpruning(depth, turn, turn, -100, +100, board)
+def MinimaxPruningStrat(depth, turn, board, stats=None):
+    if stats: stats.setDepth(depth, board)
+    [x, y, _] = mmpruning(depth, turn, turn, -100, +100, board, stats)
     return (x,y)
 
 # Inputs:
@@ -275,11 +446,14 @@ def MinimaxPruningStrat(depth, turn, board):
 #     alpha = largest reachable score by us
 #     beta = smallest reachable score by opponent
 #     board = current board
+#     stats = SearchStats to count in, or None
 # Outputs:
 #     best = [best x, best y, score after reaching (best x, best y)]
-def mmpruning(depth, turn, curTurn, alpha, beta, board):
+def mmpruning(depth, turn, curTurn, alpha, beta, board, stats=None):
+    if stats: stats.nodes += 1
     
     # return if leaf state
+    if stats and (depth == 0 or gameIsDone(board)): stats.leaves += 1
     if gameIsDone(board):
         if gameIsDone(board) == 3:
             score = 0
@@ -299,7 +473,7 @@ def mmpruning(depth, turn, curTurn, alpha, beta, board):
             newBoard = updateBoard((x,y), curTurn, board)
             nextTurn = 2 if curTurn==1 else 1
             move_result = mmpruning(depth-1, turn, nextTurn, \
-                alpha, beta, newBoard)
+                alpha, beta, newBoard, stats)
 
             # update best
             move_result[0], move_result[1] = x, y
@@ -309,6 +483,7 @@ def mmpruning(depth, turn, curTurn, alpha, beta, board):
             # update alpha
             alpha = max(alpha, best[2])
             if beta <= alpha:
+                if stats: stats.cutoffs += 1
                 break
         return best
     
@@ -320,7 +495,7 @@ def mmpruning(depth, turn, curTurn, alpha, beta, board):
             newBoard = updateBoard((x,y), curTurn, board)
             nextTurn = 2 if curTurn==1 else 1
             move_result = mmpruning(depth-1, turn, nextTurn, \
-                alpha, beta, newBoard)
+                alpha, beta, newBoard, stats)
 
             # update best
             move_result[0], move_result[1] = x, y
@@ -330,9 +505,1045 @@ def mmpruning(depth, turn, curTurn, alpha, beta, board):
             # update beta
             beta = min(beta, best[2])
             if beta <= alpha:
+                if stats: stats.cutoffs += 1
                 break
         return best
 
+##### In-Place Search #####
+# minimax and mmpruning copy the whole board (updateBoard) for every
+# node they visit. The versions below make a move on a single shared
+# board, search, and then unmake it (like addEdge/removeEdge in Sim),
+# so they pick the exact same moves w/o all the copies
+
+# use simple minimax (no pruning) on a single board up to depth 'depth'
+def MinimaxInPlaceStrat(depth, turn, board, stats=None):
+    if stats: stats.setDepth(depth, board)
+    [x, y, _] = minimaxInPlace(depth, turn, turn, deepcopy(board), stats)
+    return (x,y)
+
+# Same as minimax, but board is changed (and restored) during the search
+def minimaxInPlace(depth, turn, curTurn, board, stats=None):
+    if stats: stats.nodes += 1
+
+    # if we reached an end state, return 0 (end of depth or
+    # a tie), +1 (turn wins), or -1 (turn loses)
+    result = gameIsDone(board)
+    if stats and (depth == 0 or result): stats.leaves += 1
+    if result:
+        if result == 3:
+            score = 0
+        elif result == turn:
+            score = +1
+        else:
+            score = -1
+        return [-1, -1, score]
+    if depth == 0:
+        return [-1, -1, 0]
+
+    if curTurn == turn: # we want to maximize my score
+        best = [-1, -1, -100]
+    else: # opponent wants to minimize my score
+        best = [-1, -1, +100]
+
+    nextTurn = 2 if curTurn==1 else 1
+    for move in getValidMoves(board):
+        (x, y) = move
+        undo = makeMove(move, curTurn, board)
+        move_result = minimaxInPlace(depth-1, turn, nextTurn, board, stats)
+        unmakeMove(move, board, undo)
+
+        move_result[0], move_result[1] = x, y
+        if curTurn == turn: # we want to maximize best
+            if move_result[2] > best[2]:
+                best = move_result
+        else: # opponent wants to minimize best
+            if move_result[2] < best[2]:
+                best = move_result
+    return best
+
+# use minimax with alpha-beta pruning on a single board
+def MinimaxPruningInPlaceStrat(depth, turn, board, stats=None):
+    if stats: stats.setDepth(depth, board)
+    [x, y, _] = mmpruningInPlace(depth, turn, turn, -100, +100, \
+        deepcopy(board), None, stats)
+    return (x,y)
+
+# Same as mmpruning, but board is changed (and restored) during the search.
+# If 'ordering' (a MoveOrdering) is given, moves are tried in its order
+def mmpruningInPlace(depth, turn, curTurn, alpha, beta, board, \
+                     ordering=None, stats=None):
+    if stats: stats.nodes += 1
+
+    # return if leaf state
+    result = gameIsDone(board)
+    if stats and (depth == 0 or result): stats.leaves += 1
+    if result:
+        if result == 3:
+            score = 0
+        elif result == turn:
+            score = +1
+        else:
+            score = -1
+        return [-1, -1, score]
+    if depth == 0:
+        return [-1, -1, 0]
+
+    if curTurn == turn: # we want to maximize my score
+        best = [-1, -1, -100]
+    else: # opponent wants to minimize my score
+        best = [-1, -1, +100]
+
+    moves = getValidMoves(board)
+    if ordering:
+        moves = ordering.order(moves, curTurn, board)
+
+    nextTurn = 2 if curTurn==1 else 1
+    for move in moves:
+        (x, y) = move
+        undo = makeMove(move, curTurn, board)
+        move_result = mmpruningInPlace(depth-1, turn, nextTurn, \
+            alpha, beta, board, ordering, stats)
+        unmakeMove(move, board, undo)
+
+        # update best, then alpha or beta
+        move_result[0], move_result[1] = x, y
+        if curTurn == turn:
+            if move_result[2] > best[2]:
+                best = move_result
+            alpha = max(alpha, best[2])
+        else:
+            if move_result[2] < best[2]:
+                best = move_result
+            beta = min(beta, best[2])
+        if beta <= alpha:
+            if ordering:
+                ordering.cutoff(move, depth, len(moves))
+            if stats: stats.cutoffs += 1
+            break
+    return best
+
+##### Move Ordering #####
+# Alpha-beta prunes the most when the best move is tried first, but
+# getValidMoves always goes row by row. MoveOrdering sorts the moves:
+#   1. moves that win right away
+#   2. moves that block the opponent from winning right away
+#   3. killer moves: moves that caused a cutoff at the same ply before
+#   4. everything else, by history (how often the move caused cutoffs
+#      anywhere in the search), then by how many lines go through the
+#      square (centre > corners > edges on 3x3)
+# Each heuristic can be turned off, eg. MoveOrdering(killers=False)
+
+# number of k-in-a-row lines that go through each square of the board
+lineCountCache = {}
+def lineCounts(board):
+    n, m = len(board), len(board[0])
+    k = board.k if isinstance(board, MNKBoard) else 3
+    if (n, m, k) in lineCountCache:
+        return lineCountCache[(n, m, k)]
+    counts = [[0]*m for _ in range(n)]
+    for xb in range(n):
+        for yb in range(m):
+            for (dx, dy) in DIRECTIONS:
+                # lines that start 0 to k-1 squares before (xb,yb)
+                for back in range(k):
+                    x0, y0 = xb - back*dx, yb - back*dy
+                    x1, y1 = x0 + (k-1)*dx, y0 + (k-1)*dy
+                    if 0 <= min(x0, x1) and max(x0, x1) < n and \
+                       0 <= min(y0, y1) and max(y0, y1) < m:
+                        counts[xb][yb] += 1
+    lineCountCache[(n, m, k)] = counts
+    return counts
+
+class MoveOrdering:
+    def __init__(self, wins=True, blocks=True, centre=True, \
+                 killers=True, history=True):
+        self.wins = wins
+        self.blocks = blocks
+        self.centre = centre
+        self.useKillers = killers
+        self.useHistory = history
+        self.killers = {} # number of empty squares -> [killer moves]
+        self.history = {} # move -> cutoff score
+
+    # does 'turn' win by playing 'move'?
+    def winsWith(self, move, turn, board):
+        undo = makeMove(move, turn, board)
+        won = gameIsDone(board) == turn
+        unmakeMove(move, board, undo)
+        return won
+
+    # return the moves sorted with the most promising first
+    def order(self, moves, turn, board):
+        oppturn = 2 if turn==1 else 1
+        killers = self.killers.get(len(moves), []) \
+            if self.useKillers else []
+        counts = lineCounts(board) if self.centre else None
+        n = len(board)
+
+        def key(move):
+            if self.wins and self.winsWith(move, turn, board):
+                tier = 0
+            elif self.blocks and self.winsWith(move, oppturn, board):
+                tier = 1
+            elif move in killers:
+                tier = 2
+            else:
+                tier = 3
+            history = self.history.get(move, 0) if self.useHistory else 0
+            if counts:
+                (xb, yb) = xy_to_board(move, n)
+                lines = counts[xb][yb]
+            else:
+                lines = 0
+            return (tier, -history, -lines)
+        return sorted(moves, key=key)
+
+    # 'move' caused a cutoff with 'depth' left to search, in a position
+    # with 'empty' empty squares
+    def cutoff(self, move, depth, empty):
+        if self.useKillers:
+            killers = self.killers.setdefault(empty, [])
+            if move not in killers:
+                killers.insert(0, move)
+                del killers[2:] # keep the 2 most recent
+        if self.useHistory:
+            self.history[move] = self.history.get(move, 0) + depth*depth
+
+# use minimax with alpha-beta pruning and move ordering on a single board
+def MinimaxPruningOrderedStrat(depth, turn, board, stats=None):
+    if stats: stats.setDepth(depth, board)
+    ordering = MoveOrdering()
+    [x, y, _] = mmpruningInPlace(depth, turn, turn, -100, +100, \
+        deepcopy(board), ordering, stats)
+    return (x,y)
+
+##### Iterative Deepening #####
+# A fixed depth is fine on 3x3, but on bigger m,n,k boards depth 10
+# never finishes. Instead, search depth 1, 2, 3, ... until time runs
+# out, and play the move from the deepest search that finished. Each
+# search tries the previous one's best line (principal variation) first
+
+class SearchTimeout(Exception):
+    pass
+
+# search for at most 'timeLimit' seconds, up to depth 'maxDepth'
+# (unless threatSearch finds a forced win first)
+def IterativeDeepeningStrat(timeLimit, turn, board, maxDepth=None, \
+                            stats=None, threats=True):
+    deadline = time.perf_counter() + timeLimit
+    # a forced win by threats is found much faster w/o the full search
+    if threats:
+        move = threatSpaceWin(turn, board, stats=stats)
+        if move:
+            return move
+    board = deepcopy(board)
+    if maxDepth is None:
+        maxDepth = len(getValidMoves(board))
+
+    # in case not even depth 1 finishes in time
+    bestMove = getValidMoves(board)[0]
+    pv = []
+    # killers and history carry over from one depth to the next
+    ordering = MoveOrdering()
+    for depth in range(1, maxDepth+1):
+        try:
+            [x, y, score, pv] = mmpruningDeadline(depth, turn, turn, \
+                -100, +100, board, deadline, pv, ordering, stats)
+        except SearchTimeout:
+            break
+        bestMove = (x,y)
+        if stats: stats.depth = depth
+        # a win or loss is already certain; searching deeper won't help
+        if score != 0:
+            break
+    return bestMove
+
+# Same as mmpruningInPlace, but tries the moves of 'pv' first, returns
+# [x, y, score, best line], and raises SearchTimeout after 'deadline'
+def mmpruningDeadline(depth, turn, curTurn, alpha, beta, board, \
+                      deadline, pv, ordering=None, stats=None):
+    if time.perf_counter() > deadline:
+        raise SearchTimeout()
+    if stats: stats.nodes += 1
+
+    # return if leaf state
+    result = gameIsDone(board)
+    if stats and (depth == 0 or result): stats.leaves += 1
+    if result:
+        if result == 3:
+            score = 0
+        elif result == turn:
+            score = +1
+        else:
+            score = -1
+        return [-1, -1, score, []]
+    if depth == 0:
+        return [-1, -1, 0, []]
+
+    if curTurn == turn: # we want to maximize my score
+        best = [-1, -1, -100, []]
+    else: # opponent wants to minimize my score
+        best = [-1, -1, +100, []]
+
+    # principal variation move first
+    moves = getValidMoves(board)
+    if ordering:
+        moves = ordering.order(moves, curTurn, board)
+    if pv and pv[0] in moves:
+        moves.remove(pv[0])
+        moves.insert(0, pv[0])
+
+    nextTurn = 2 if curTurn==1 else 1
+    for move in moves:
+        (x, y) = move
+        # the rest of the line only applies below the pv move
+        childPv = pv[1:] if pv and move == pv[0] else []
+        undo = makeMove(move, curTurn, board)
+        try:
+            move_result = mmpruningDeadline(depth-1, turn, nextTurn, \
+                alpha, beta, board, deadline, childPv, ordering, stats)
+        finally:
+            unmakeMove(move, board, undo)
+
+        # update best, then alpha or beta
+        move_result = [x, y, move_result[2], [move] + move_result[3]]
+        if curTurn == turn:
+            if move_result[2] > best[2]:
+                best = move_result
+            alpha = max(alpha, best[2])
+        else:
+            if move_result[2] < best[2]:
+                best = move_result
+            beta = min(beta, best[2])
+        if beta <= alpha:
+            if ordering:
+                ordering.cutoff(move, depth, len(moves))
+            if stats: stats.cutoffs += 1
+            break
+    return best
+
+##### Monte Carlo Tree Search #####
+# On big boards like 15x15 gomoku, alpha-beta can't look far enough
+# ahead. MCTSStrat plays lots of random games from the current board
+# instead, and grows a tree of the moves that win the most often
+# (picked with UCT), like MCTSStrat in chomp_util.py. To keep it fast:
+#   - boards are flat bytearrays, where cells[xb*m + yb] = board[xb][yb]
+#   - the tree only tries squares near the pieces already on the board
+#   - moves that win right away are tried first, and moves that surely
+#     win or lose are remembered
+#   - each player's tree is kept for their next move
+# The tree's nodes share their UCT code with chomp_util.py (see
+# mcts_util.py). With a SearchStats, nodes counts the tree's new nodes
+# and leaves counts the random games, so leaves/seconds = playouts/s.
+
+MCTS_C = 1.4   # exploration constant of UCT
+MCTS_NEAR = 2  # only try squares at most 2 squares away from a piece
+
+# each player's tree, kept from their last move:
+#     mctsTrees[turn] = ((m, n, k), cells of the root, root), or None
+mctsTrees = {1: None, 2: None}
+
+# rays[i] = for each direction, the squares after and before square i
+# that a line of k through i can use
+rayCache = {}
+def cellRays(m, n, k):
+    if (m, n, k) in rayCache:
+        return rayCache[(m, n, k)]
+    rays = []
+    for i in range(m*n):
+        (xb, yb) = divmod(i, m)
+        lines = []
+        for (dx, dy) in DIRECTIONS:
+            sides = []
+            for sign in [1, -1]:
+                side = []
+                (x, y) = (xb + sign*dx, yb + sign*dy)
+                while len(side) < k-1 and 0 <= x < n and 0 <= y < m:
+                    side.append(x*m + y)
+                    (x, y) = (x + sign*dx, y + sign*dy)
+                sides.append(side)
+            lines.append(sides)
+        rays.append(lines)
+    rayCache[(m, n, k)] = rays
+    return rays
+
+# does the piece on cells[i] make k in a row?
+def cellsWins(cells, i, k, rays):
+    piece = cells[i]
+    for (after, before) in rays[i]:
+        count = 1
+        for j in after:
+            if cells[j] != piece:
+                break
+            count += 1
+        for j in before:
+            if cells[j] != piece:
+                break
+            count += 1
+        if count >= k:
+            return True
+    return False
+
+# empty squares at most MCTS_NEAR away from a piece (the centre if the
+# board is empty)
+def nearbyCells(cells, m, n):
+    near = set()
+    for i in range(m*n):
+        if cells[i]:
+            (xb, yb) = divmod(i, m)
+            for x in range(max(0, xb-MCTS_NEAR), min(n, xb+MCTS_NEAR+1)):
+                for y in range(max(0, yb-MCTS_NEAR), \
+                               min(m, yb+MCTS_NEAR+1)):
+                    if not cells[x*m + y]:
+                        near.add(x*m + y)
+    if not any(cells):
+        near.add((n//2)*m + m//2)
+    return list(near)
+
+# Node of the Monte Carlo search tree used by MCTSStrat
+class MCTSNode(UCTNode):
+    __slots__ = ('turn',)
+
+    # cells = position after player 'turn' played square 'move' from
+    # parent's position (move is None at the root). Only the squares
+    # near the pieces are tried, so a position where all of them lose
+    # counts as lost
+    def __init__(self, cells, move, turn, parent, m, n, k, rays):
+        UCTNode.__init__(self, move, parent)
+        self.turn = turn
+        # wins count ties as half
+        if move is not None and cellsWins(cells, move, k, rays):
+            self.proven = True
+            return
+
+        self.untried = nearbyCells(cells, m, n)
+        random.shuffle(self.untried)
+        # try the moves that win right away first (they're popped first)
+        nextTurn = 2 if turn==1 else 1
+        wins = []
+        for i in self.untried:
+            cells[i] = nextTurn
+            if cellsWins(cells, i, k, rays):
+                wins.append(i)
+            cells[i] = 0
+        for i in wins:
+            self.untried.remove(i)
+            self.untried.append(i)
+
+# play random moves on cells until the game is over; return the
+# winner (1 or 2), or 3 if it's a tie
+def randomPlayout(cells, toMove, k, rays):
+    empty = [i for i in range(len(cells)) if not cells[i]]
+    random.shuffle(empty)
+    for i in empty:
+        cells[i] = toMove
+        if cellsWins(cells, i, k, rays):
+            return toMove
+        toMove = 2 if toMove==1 else 1
+    return 3
+
+# root of the search tree for cells: the node of the opponent's reply
+# to our last move if it was searched, else a new tree
+def reuseTree(cells, turn, m, n, k, rays):
+    mctsTree = mctsTrees[turn]
+    if mctsTree is not None and mctsTree[0] == (m, n, k):
+        (_, treeCells, tree) = mctsTree
+        for child in tree.children:
+            if child.turn != turn and cells[child.move] == child.turn:
+                after = bytearray(treeCells)
+                after[child.move] = child.turn
+                if after == cells:
+                    child.parent = None
+                    return child
+    lastTurn = 2 if turn==1 else 1
+    return MCTSNode(bytearray(cells), None, lastTurn, None, m, n, k, rays)
+
+# search for 'timeLimit' seconds, then play the best move found
+# (unless threatSearch finds a forced win first)
+def MCTSStrat(timeLimit, turn, board, stats=None, threats=True):
+    # a forced win by threats is found much faster w/o the full search
+    if threats:
+        move = threatSpaceWin(turn, board, stats=stats)
+        if move:
+            mctsTrees[turn] = None
+            return move
+    n, m = len(board), len(board[0])
+    k = board.k if isinstance(board, MNKBoard) else 3
+    rays = cellRays(m, n, k)
+    rootCells = bytearray(square for row in board for square in row)
+    root = reuseTree(rootCells, turn, m, n, k, rays)
+
+    deadline = time.perf_counter() + timeLimit
+    while root.proven is None and time.perf_counter() < deadline:
+        cells = bytearray(rootCells)
+
+        # 1. selection: walk down the fully expanded nodes
+        node = root
+        while not node.untried and node.children \
+                and node.proven is None:
+            node = node.selectChild(MCTS_C)
+            cells[node.move] = node.turn
+
+        # 2. expansion: add one new child
+        if node.untried and node.proven is None:
+            move = node.untried.pop()
+            nextTurn = 2 if node.turn==1 else 1
+            cells[move] = nextTurn
+            node = MCTSNode(cells, move, nextTurn, node, m, n, k, rays)
+            node.parent.children.append(node)
+            node.propagateProof()
+            if stats: stats.nodes += 1
+
+        # 3. simulation: play randomly until the game is over.
+        # won = score of the player who played node.move
+        if node.proven is not None:
+            won = 1 if node.proven else 0
+        elif not node.untried and not node.children: # board is full
+            won = 0.5
+        else:
+            nextTurn = 2 if node.turn==1 else 1
+            winner = randomPlayout(cells, nextTurn, k, rays)
+            won = 0.5 if winner == 3 else int(winner == node.turn)
+            if stats: stats.leaves += 1
+
+        # 4. backpropagation: flip the result at every level
+        while node is not None:
+            node.visits += 1
+            node.wins += won
+            won = 1 - won
+            node = node.parent
+
+    if not root.children: # no time to search at all
+        mctsTrees[turn] = None
+        move = random.choice(root.untried)
+    else:
+        # play a move that surely wins, else the most visited move that
+        # doesn't surely lose, and keep its subtree
+        def score(child):
+            return (child.proven is True, child.proven is not False, \
+                    child.visits)
+        best = max(root.children, key=score)
+        best.parent = None
+        move = best.move
+        rootCells[move] = turn
+        mctsTrees[turn] = ((m, n, k), rootCells, best)
+    return board_to_xy(divmod(move, m), n)
+
+##### Threat-Space Search #####
+# On big boards most moves are quiet and only threats decide the game.
+# A threat is a move after which the opponent must answer in one of a
+# few squares, or lose:
+#   - a four: k-1 in a line of k with 1 empty square (the gain square);
+#     the opponent must take it
+#   - a three: k-2 in a line of k, so that next move could make 2 fours
+#     at once; the opponent must take one of those squares
+# threatSearch only tries threats, and only those on lines through the
+# attacker's previous threats (dependency-based pruning), and tries
+# every answer of the defender. If the attacker wins against all of
+# them, the first threat is a forced win. Searched positions are kept
+# in threatCache, with the winning threat sequence (or None)
+#
+# To stay safe, threes are only played when the defender can't make a
+# four of their own, since a four would have to be answered first
+
+THREAT_DEPTH = 4 # max number of threats in a row
+THREAT_CACHE_SIZE = 100000
+
+# (m, n, k, cells, related squares, depth) -> winning sequence or None
+threatCache = {}
+
+# all the k-in-a-row lines of the board as tuples of squares, and
+# for every square, the indexes of the lines through it
+windowCache = {}
+def cellWindows(m, n, k):
+    if (m, n, k) in windowCache:
+        return windowCache[(m, n, k)]
+    windows = []
+    byCell = [[] for _ in range(m*n)]
+    for xb in range(n):
+        for yb in range(m):
+            for (dx, dy) in DIRECTIONS:
+                (x, y) = (xb + (k-1)*dx, yb + (k-1)*dy)
+                if 0 <= x < n and 0 <= y < m:
+                    window = tuple((xb + i*dx)*m + yb + i*dy \
+                                   for i in range(k))
+                    for i in window:
+                        byCell[i].append(len(windows))
+                    windows.append(window)
+    windowCache[(m, n, k)] = (windows, byCell)
+    return (windows, byCell)
+
+# number of pieces of 'piece' in a window, or -1 if the other player
+# has a piece in it
+def windowCount(cells, window, piece):
+    pieces = [cells[i] for i in window]
+    count = pieces.count(piece)
+    if count + pieces.count(0) < len(pieces):
+        return -1
+    return count
+
+# empty squares of a window
+def windowEmpty(cells, window):
+    return [i for i in window if not cells[i]]
+
+# squares that would complete k in a row for 'piece', on the lines
+# through 'windowIds'
+def gainSquares(cells, piece, k, windows, windowIds):
+    gains = set()
+    for w in windowIds:
+        if windowCount(cells, windows[w], piece) == k-1:
+            gains.update(windowEmpty(cells, windows[w]))
+    return gains
+
+# if 'attacker' plays square c, which squares must the defender answer
+# in? Return [] if c isn't a threat
+def threatAnswers(cells, c, attacker, k, windows, byCell, threes):
+    cells[c] = attacker
+    gains = gainSquares(cells, attacker, k, windows, byCell[c])
+    if gains or not threes:
+        cells[c] = 0
+        return list(gains)
+
+    # a three: find the squares that would then make 2 fours at once
+    answers = set()
+    for w in byCell[c]:
+        if windowCount(cells, windows[w], attacker) != k-2:
+            continue
+        for j in windowEmpty(cells, windows[w]):
+            cells[j] = attacker
+            fours = gainSquares(cells, attacker, k, windows, byCell[j])
+            cells[j] = 0
+            if len(fours) >= 2:
+                answers.add(j)
+                answers |= fours
+    cells[c] = 0
+    return list(answers)
+
+# search for a sequence of threats that wins for 'attacker' (to move)
+# Inputs:
+#     related = squares of the attacker's threats so far (new threats
+#         must be on a line through one of them), or all of the
+#         attacker's pieces if isRoot
+#     depth = max number of threats left
+#     defLines = lines where the defender has at least k-2 pieces (and
+#         maybe some that don't anymore), or None to scan the board
+# Outputs:
+#     the attacker's moves of a winning line, or None if none was found
+def threatSearch(cells, attacker, related, depth, m, n, k, \
+                 windows, byCell, stats=None, isRoot=False, defLines=None):
+    if stats: stats.nodes += 1
+    defender = 2 if attacker==1 else 1
+
+    # win right away if we can. Otherwise, the candidate threats are
+    # the empty squares on lines through related squares that the
+    # defender hasn't blocked and that could make a three
+    candidates = set()
+    for w in set(w for i in related for w in byCell[i]):
+        count = windowCount(cells, windows[w], attacker)
+        if count == k-1:
+            return windowEmpty(cells, windows[w])
+        if count >= k-3 and depth > 0:
+            candidates.update(windowEmpty(cells, windows[w]))
+    if depth == 0:
+        return None
+
+    key = (m, n, k, bytes(cells), frozenset(related), depth)
+    if key in threatCache:
+        if stats: stats.ttHits += 1
+        return threatCache[key]
+
+    # if the defender threatens to win, we have to block it. We can
+    # only play threes if the defender can't make a four
+    if defLines is None:
+        defLines = range(len(windows))
+    defLines = [w for w in defLines \
+                if windowCount(cells, windows[w], defender) >= k-2]
+    blocks = gainSquares(cells, defender, k, windows, defLines)
+    if len(blocks) > 1:
+        return None
+    threes = not defLines
+
+    if blocks:
+        candidates &= blocks
+
+    result = None
+    for c in sorted(candidates):
+        answers = threatAnswers(cells, c, attacker, k, windows, byCell, \
+            threes)
+        if not answers:
+            continue
+        # the defender tries every answer; we need a win against all
+        cells[c] = attacker
+        line = None
+        for a in answers:
+            cells[a] = defender
+            if cellsWins(cells, a, k, cellRays(m, n, k)):
+                line = None
+            else:
+                sequence = [c] if isRoot else related + [c]
+                line = threatSearch(cells, attacker, sequence, \
+                    depth-1, m, n, k, windows, byCell, stats, False, \
+                    defLines + byCell[a])
+            cells[a] = 0
+            if line is None:
+                break
+        cells[c] = 0
+        if line is not None:
+            result = [c] + line
+            break
+
+    if len(threatCache) >= THREAT_CACHE_SIZE:
+        threatCache.clear()
+    threatCache[key] = result
+    return result
+
+# the first move of a forced win by threats for 'turn', or None
+def threatSpaceWin(turn, board, maxDepth=THREAT_DEPTH, stats=None):
+    n, m = len(board), len(board[0])
+    k = board.k if isinstance(board, MNKBoard) else 3
+    (windows, byCell) = cellWindows(m, n, k)
+    cells = bytearray(square for row in board for square in row)
+    related = [i for i in range(m*n) if cells[i] == turn]
+    if not related:
+        return None
+    line = threatSearch(cells, turn, related, maxDepth, m, n, k, \
+        windows, byCell, stats, True)
+    if line is None:
+        return None
+    return board_to_xy(divmod(line[0], m), n)
+
+##### Bitboard Engine #####
+# Instead of a 3x3 list of lists, each player's pieces can be stored as
+# a 9-bit number, w/ bit i = 3*xb + yb set if the player has board[xb][yb].
+# A line of 3 is then a single AND with a precomputed mask, and placing
+# a piece is a single OR. masks = [0, Player 1's bits, Player 2's bits]
+
+FULL_MASK = (1<<9) - 1
+WIN_MASKS = [0b000000111, 0b000111000, 0b111000000, # rows
+             0b001001001, 0b010010010, 0b100100100, # columns
+             0b100010001, 0b001010100]              # diagonals
+# bits in the same order as getValidMoves, so moves are tried in
+# the same order as the other strategies
+MOVE_BITS = [1 << (3*xb + yb) for (xb, yb) in \
+             [xy_to_board((x,y)) for x in range(1,4) for y in range(1,4)]]
+
+def boardToMasks(board):
+    masks = [0, 0, 0]
+    for xb in range(3):
+        for yb in range(3):
+            masks[board[xb][yb]] |= 1 << (3*xb + yb)
+    masks[0] = 0
+    return masks
+
+# (x,y) of the single set bit of 'bit'
+def bit_to_xy(bit):
+    i = bit.bit_length() - 1
+    return board_to_xy((i//3, i%3))
+
+# return whether the 9-bit mask has 3 in a row
+def masksHasLine(mask):
+    for win in WIN_MASKS:
+        if mask & win == win:
+            return True
+    return False
+
+# same as gameIsDone, for masks
+def masksGameIsDone(masks):
+    if masksHasLine(masks[1]):
+        return 1
+    if masksHasLine(masks[2]):
+        return 2
+    if masks[1] | masks[2] == FULL_MASK:
+        return 3
+    return 0
+
+# use minimax with alpha-beta pruning on bitboards up to depth 'depth'
+def BitboardPruningStrat(depth, turn, board, stats=None):
+    masks = boardToMasks(board)
+    if masksGameIsDone(masks):
+        return (-1, -1)
+    if stats: stats.setDepth(depth, board)
+    [bit, _] = bbpruning(depth, turn, turn, -100, +100, masks, stats)
+    return bit_to_xy(bit)
+
+# Same as mmpruning, but on masks (which are changed and then restored).
+# The position must not be over yet
+# Outputs:
+#     best = [bit of best move, score after playing it]
+def bbpruning(depth, turn, curTurn, alpha, beta, masks, stats=None):
+    if stats: stats.nodes += 1
+    if depth == 0:
+        if stats: stats.leaves += 1
+        return [0, 0]
+
+    if curTurn == turn: # we want to maximize my score
+        best = [0, -100]
+    else: # opponent wants to minimize my score
+        best = [0, +100]
+    nextTurn = 2 if curTurn==1 else 1
+    taken = masks[1] | masks[2]
+    for bit in MOVE_BITS:
+        if taken & bit:
+            continue
+
+        # place the piece, and check if the game is over
+        masks[curTurn] |= bit
+        if stats and (masksHasLine(masks[curTurn]) or \
+                      taken | bit == FULL_MASK): # scored right here
+            stats.nodes += 1
+            stats.leaves += 1
+        if masksHasLine(masks[curTurn]):
+            score = +1 if curTurn == turn else -1
+        elif taken | bit == FULL_MASK: # tie
+            score = 0
+        else:
+            [_, score] = bbpruning(depth-1, turn, nextTurn, \
+                alpha, beta, masks, stats)
+        masks[curTurn] ^= bit
+
+        # update best, then alpha or beta
+        if curTurn == turn:
+            if score > best[1]:
+                best = [bit, score]
+            alpha = max(alpha, best[1])
+        else:
+            if score < best[1]:
+                best = [bit, score]
+            beta = min(beta, best[1])
+        if beta <= alpha:
+            if stats: stats.cutoffs += 1
+            break
+    return best
+
+##### Transposition Table #####
+# mmpruning searches the same position again every time it's reached
+# by a different move order, or as a rotated/reflected copy. mmpruningTT
+# remembers every searched position in a transposition table, keyed by
+# the smallest base-3 code of the 8 rotations/reflections of the board
+
+# the 8 symmetries of the board, each as a list p where the symmetric
+# board has the piece at board square p[i] on square i (i = 3*xb + yb)
+SYMMETRIES = [[3*xb + yb for (xb, yb) in \
+               [f(i//3, i%3) for i in range(9)]] for f in [
+    lambda xb, yb: (xb, yb),        # identity
+    lambda xb, yb: (yb, 2-xb),      # rotate 90
+    lambda xb, yb: (2-xb, 2-yb),    # rotate 180
+    lambda xb, yb: (2-yb, xb),      # rotate 270
+    lambda xb, yb: (xb, 2-yb),      # reflect left-right
+    lambda xb, yb: (2-xb, yb),      # reflect top-bottom
+    lambda xb, yb: (yb, xb),        # reflect along main diagonal
+    lambda xb, yb: (2-yb, 2-xb),    # reflect along other diagonal
+]]
+
+# transposition table flags: the stored score is exact, or only a
+# lower bound (search was cut off by beta) or upper bound (by alpha)
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# return (smallest code of all symmetric boards, its symmetry p)
+def canonicalCode(board):
+    squares = [board[i//3][i%3] for i in range(9)]
+    best = None
+    for p in SYMMETRIES:
+        code = 0
+        for i in range(8, -1, -1):
+            code = 3*code + squares[p[i]]
+        if best is None or code < best[0]:
+            best = (code, p)
+    return best
+
+# use minimax with alpha-beta pruning and a transposition table
+def MinimaxPruningTTStrat(depth, turn, board, stats=None):
+    if stats: stats.setDepth(depth, board)
+    [x, y, _] = mmpruningTT(depth, turn, turn, -100, +100, board, {}, \
+        stats)
+    return (x,y)
+
+# Same as mmpruning, plus:
+#     table = transposition table (dict), where
+#         table[(canonical code, curTurn)] = [depth, score, flag, square]
+#         and square is the best move's square in the canonical board
+#     stats = SearchStats to count in, or None
+def mmpruningTT(depth, turn, curTurn, alpha, beta, board, table, \
+                stats=None):
+    if stats: stats.nodes += 1
+
+    # return if leaf state
+    if stats and (depth == 0 or gameIsDone(board)): stats.leaves += 1
+    if gameIsDone(board):
+        if gameIsDone(board) == 3:
+            score = 0
+        elif gameIsDone(board) == turn:
+            score = +1
+        else:
+            score = -1
+        return [-1, -1, score]
+    if depth == 0:
+        return [-1, -1, 0]
+
+    # look up the position; stored moves are mapped back through the
+    # symmetry p to squares of this board
+    (code, p) = canonicalCode(board)
+    entry = table.get((code, curTurn))
+    ttMove = None
+    if entry:
+        [entryDepth, score, flag, square] = entry
+        ttMove = board_to_xy((p[square]//3, p[square]%3))
+        if entryDepth >= depth:
+            if stats: stats.ttHits += 1
+            if flag == EXACT:
+                return [ttMove[0], ttMove[1], score]
+            elif flag == LOWER:
+                alpha = max(alpha, score)
+            elif flag == UPPER:
+                beta = min(beta, score)
+            if beta <= alpha:
+                return [ttMove[0], ttMove[1], score]
+    alphaOrig, betaOrig = alpha, beta
+
+    # try the stored best move first
+    validMoves = getValidMoves(board)
+    if ttMove in validMoves:
+        validMoves.remove(ttMove)
+        validMoves.insert(0, ttMove)
+
+    if curTurn == turn: # we want to maximize my score
+        best = [-1, -1, -100]
+    else: # opponent wants to minimize my score
+        best = [-1, -1, +100]
+    nextTurn = 2 if curTurn==1 else 1
+    for move in validMoves:
+        (x, y) = move
+        newBoard = updateBoard((x,y), curTurn, board)
+        move_result = mmpruningTT(depth-1, turn, nextTurn, \
+            alpha, beta, newBoard, table, stats)
+
+        # update best, then alpha or beta
+        move_result[0], move_result[1] = x, y
+        if curTurn == turn:
+            if move_result[2] > best[2]:
+                best = move_result
+            alpha = max(alpha, best[2])
+        else:
+            if move_result[2] < best[2]:
+                best = move_result
+            beta = min(beta, best[2])
+        if beta <= alpha:
+            if stats: stats.cutoffs += 1
+            break
+
+    # store the result, w/ the best move as a square of the canonical board
+    if best[2] <= alphaOrig:
+        flag = UPPER
+    elif best[2] >= betaOrig:
+        flag = LOWER
+    else:
+        flag = EXACT
+    (xb, yb) = xy_to_board((best[0], best[1]))
+    table[(code, curTurn)] = [depth, best[2], flag, p.index(3*xb + yb)]
+    return best
+
+##### Perfect-Play Table #####
+# Tic-tac-toe only has 5,478 legal positions, so we can solve all of
+# them once and then play perfectly by simply looking up the answer.
+# Each board is keyed by its base-3 code:
+#     code = sum of board[xb][yb] * 3^(3*xb + yb)
+# and table[code] (a 16-bit number) holds the value of the position
+# for the player to move (+1 win, 0 tie, -1 loss) in the lowest 2 bits
+# as value+2, and a 9-bit mask of all best squares (bit 3*xb + yb)
+# above that. table[code] == 0 means the board isn't a legal position.
+# The table is built on first use and saved next to this file.
+
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'tictactoe_table.bin')
+TABLE_SIZE = 3**9
+perfectTable = None
+
+# base-3 code of the board
+def boardCode(board):
+    code = 0
+    for i in range(8, -1, -1):
+        code = 3*code + board[i//3][i%3]
+    return code
+
+# the player who moves next: Player 1 moves first
+def turnToMove(board):
+    pieces = [0, 0, 0]
+    for row in board:
+        for B in row:
+            pieces[B] += 1
+    return 1 if pieces[1] == pieces[2] else 2
+
+# fill in table for the board and every position after it, and return
+# the board's value for 'turn' (the player to move)
+def solvePosition(turn, board, code, table):
+    if table[code]:
+        return (table[code] & 3) - 2
+
+    result = gameIsDone(board)
+    if result:
+        value = 0 if result == 3 else -1 # else the last mover won
+        table[code] = value+2
+        return value
+
+    best = -2
+    bestMoves = 0
+    nextTurn = 2 if turn==1 else 1
+    for xb in range(3):
+        for yb in range(3):
+            if board[xb][yb] != 0:
+                continue
+            i = 3*xb + yb
+            board[xb][yb] = turn
+            value = -solvePosition(nextTurn, board, code + turn*3**i, table)
+            board[xb][yb] = 0
+            if value > best:
+                best, bestMoves = value, 0
+            if value == best:
+                bestMoves |= 1 << i
+    table[code] = (best+2) | (bestMoves << 2)
+    return best
+
+def buildTable():
+    table = array('H', [0]) * TABLE_SIZE
+    board = [[0]*3 for _ in range(3)]
+    solvePosition(1, board, 0, table)
+    return table
+
+# return the perfect-play table: from memory, else from TABLE_FILE,
+# else build it (and save it to TABLE_FILE for next time)
+def getTable():
+    global perfectTable
+    if perfectTable is not None:
+        return perfectTable
+
+    table = array('H')
+    try:
+        with open(TABLE_FILE, 'rb') as f:
+            table.fromfile(f, TABLE_SIZE)
+    except (OSError, EOFError):
+        table = buildTable()
+        try:
+            with open(TABLE_FILE, 'wb') as f:
+                table.tofile(f)
+        except OSError:
+            pass # can't save; just build it again next time
+    perfectTable = table
+    return table
+
+# return [value for the player to move, list of all best (x,y) moves]
+def lookupPosition(board):
+    entry = getTable()[boardCode(board)]
+    bestMoves = [board_to_xy((i//3, i%3)) for i in range(9) \
+                 if entry >> (i+2) & 1]
+    return [(entry & 3) - 2, bestMoves]
+
+# play perfectly by looking up the best moves in the table
+def PerfectStrat(turn, board):
+    if turnToMove(board) != turn: # not a position from a normal game
+        return MinimaxPruningStrat(10, turn, board)
+    [_, bestMoves] = lookupPosition(board)
+    return random.choice(bestMoves)
+
 def ConsoleStrat():
     # Console Strategy - get user input from the console/terminal
     while(True):
@@ -372,11 +1583,13 @@ def ScreenStrat(board):
                 clicked = True
 
         if clicked:
-            xpos = mouse_y//100
-            ypos = mouse_x//100
+            size = squareSize(board)
+            xpos = mouse_y//size
+            ypos = mouse_x//size
 
-            if board[xpos][ypos]==0:
-                return board_to_xy((xpos, ypos))
+            if xpos < len(board) and ypos < len(board[0]) and \
+                    board[xpos][ypos]==0:
+                return board_to_xy((xpos, ypos), len(board))
 
 def HumanStrat(board, screenOn):
     if screenOn: return ScreenStrat(board)
@@ -386,33 +1599,55 @@ def HumanStrat(board, screenOn):
 def Player1Strategy(board, screenOn): # CHANGE ME!
     return HumanStrat(board, screenOn)
     # return BuildBlockStrat(1, board)
-    # return MinimaxStrat(10, 1, board)
-    # return MinimaxPruningStrat(10, 1, board)
+    # return MinimaxStrat(10, 1, board, stats)
+    # return MinimaxPruningStrat(10, 1, board, stats)
+    # return MinimaxPruningInPlaceStrat(10, 1, board, stats)
+    # return MinimaxPruningOrderedStrat(10, 1, board, stats)
+    # return IterativeDeepeningStrat(1.0, 1, board, stats=stats)
+    # return MCTSStrat(1.0, 1, board, stats)
+    # return MinimaxPruningTTStrat(10, 1, board, stats)
+    # return BitboardPruningStrat(10, 1, board, stats)
+    # return PerfectStrat(1, board)
 
 def Player2Strategy(board, screenOn): # CHANGE ME!
     return HumanStrat(board, screenOn)
     # return BuildBlockStrat(2, board)
-    # return MinimaxStrat(10, 2, board)
-    # return MinimaxPruningStrat(10, 2, board)
+    # return MinimaxStrat(10, 2, board, stats)
+    # return MinimaxPruningStrat(10, 2, board, stats)
+    # return MinimaxPruningInPlaceStrat(10, 2, board, stats)
+    # return MinimaxPruningOrderedStrat(10, 2, board, stats)
+    # return IterativeDeepeningStrat(1.0, 2, board, stats=stats)
+    # return MCTSStrat(1.0, 2, board, stats)
+    # return MinimaxPruningTTStrat(10, 2, board, stats)
+    # return BitboardPruningStrat(10, 2, board, stats)
+    # return PerfectStrat(2, board)
     
 
 
 ##### Main Function #####
 def main():
-    global screen
+    global screen, stats
 
     # Decide if you want pygame (True) or console (False)
     screenOn = True # CHANGE ME!
+    # Board with m columns and n rows; get k in a row to win.
+    # (3,3,3) is Tic-Tac-Toe. Eg. (15,15,5) is gomoku. Note that
+    # PerfectStrat, MinimaxPruningTTStrat and BitboardPruningStrat
+    # only know the 3x3 board; use IterativeDeepeningStrat
+    # or MCTSStrat on big ones
+    m, n, k = 3, 3, 3 # CHANGE ME!
+    # Count how much the computer players search (see SearchStats),
+    # print it at the end, and save it as JSON if statsFile is set
+    statsOn = False # CHANGE ME!
+    statsFile = None # CHANGE ME! Eg. 'stats.json'
     turn = 1 # player 1 is 1 (O), player 2 is 2 (X)
-    board = [
-        [0, 0, 0],
-        [0, 0, 0],
-        [0, 0, 0],
-    ]
+    board = MNKBoard(m, n, k)
+    stats = SearchStats() if statsOn else None
     
     if screenOn:
         pg.init()
-        screen = pg.display.set_mode([300, 300])
+        size = squareSize(board)
+        screen = pg.display.set_mode([m*size, n*size])
 
     print("Welcome to Tic-Tac-Toe!")
     if screenOn: drawBoard(board)    
@@ -427,6 +1662,7 @@ def main():
         # Prompt for location of player's piece
         assert not gameIsDone(board)
         print("Player %d, where will you place your piece?" % turn)
+        if stats: stats.startMove()
         if turn == 1:
             (x, y) = Player1Strategy(board, screenOn)
         elif turn == 2:
@@ -438,6 +1674,7 @@ def main():
             continue
 
         # Update board, then check win condition
+        if stats: stats.endMove(turn, (x, y))
         board = updateBoard((x, y), turn, board)
         if screenOn: drawBoard(board)    
         else:        printBoard(board)
@@ -451,6 +1688,10 @@ def main():
         print("Game is a tie!")
     else:
         print("Player %d is the winner!" % turn)
+    if stats:
+        stats.printSummary()
+        if statsFile:
+            stats.dump(statsFile)
     if screenOn:
         time.sleep(2)
     
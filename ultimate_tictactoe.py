@@ -0,0 +1,407 @@
+'''
+This Ultimate Tic-Tac-Toe visualizer+algorithm was created for the
+purposes of Project Ignite 2021: AI-m of the Game. Please do not
+redistribute publicly without permission.
+
+Ultimate Tic-Tac-Toe: 9 small Tic-Tac-Toe boards are placed in a 3x3
+grid, the big board. Getting 3 in a row on a small board wins it (and
+takes that square of the big board), and getting 3 won boards in a row
+on the big board wins the game. The square you play on sends your
+opponent to the small board in the same spot of the big board: eg. if
+you play the top-right square of any small board, your opponent must
+play in the top-right board. If that board is already won or full,
+they can play on any board that isn't.
+    Eg. O plays the middle-right square of the top-left board, so X must
+    play in the middle-right board:
+        |-----------|-----------|-----------|
+        |   |   |   |   |   |   |   |   |   |
+        |   |   | O |   |   |   |   |   |   |
+        |   |   |   |   |   |   |   |   |   |
+        |-----------|-----------|-----------|
+        |   |   |   |   |   |   | . | . | . |
+        |   |   |   |   |   |   | . | . | . |  <-- X plays here
+        |   |   |   |   |   |   | . | . | . |
+        |-----------|-----------|-----------|
+        |   |   |   |   |   |   |   |   |   |
+        |   |   |   |   |   |   |   |   |   |
+        |   |   |   |   |   |   |   |   |   |
+        |-----------|-----------|-----------|
+
+Like BitboardPruningStrat in tictactoe_solution.py, every small board
+is a 9-bit number per player (bit 3*xb + yb), and so is the big board.
+Since a small board only has 512 possible 9-bit numbers, whether it's
+won or full is looked up in a table instead of checked line by line.
+Positions are (x, y) like Tic-Tac-Toe, on the full 9x9 grid.
+'''
+
+import pygame as pg
+import random, time
+from tictactoe_solution import FULL_MASK, WIN_MASKS, masksHasLine, \
+    SearchTimeout
+
+black = (0,0,0)
+white = (255,255,255)
+yellow = (255, 255, 180) # boards the player to move may play on
+blue = (0, 0, 255) # for Player 1 (O)
+red = (255, 0, 0) # for Player 2 (X)
+SIZE = 60 # size of each square (in pixels)
+
+##### Lookup Tables #####
+# for every 9-bit mask: does it have 3 in a row, are all 9 squares
+# taken, and which squares are still empty
+WIN_TABLE = [masksHasLine(mask) for mask in range(1<<9)]
+FULL_TABLE = [mask == FULL_MASK for mask in range(1<<9)]
+EMPTY_TABLE = [[i for i in range(9) if not mask & (1<<i)] \
+               for mask in range(1<<9)]
+
+##### Game Tools #####
+# A move is (b, c): square c (0-8) of small board b (0-8), where both
+# are numbered 3*row + column, starting from the top-left
+
+class UltimateBoard:
+    def __init__(self):
+        self.turn = 1 # player to move (1 or 2)
+        # local[player][b] = player's squares on small board b
+        self.local = [None, [0]*9, [0]*9]
+        # meta[player] = small boards won by player
+        self.meta = [0, 0, 0]
+        self.decided = 0 # small boards that are won or full
+        self.sentTo = -1 # small board to play on, or -1 for any
+        self.winner = 0
+        self.history = [] # what place() needs to undo each move
+
+    # same as gameIsDone in tictactoe_solution.py: winner (1 or 2),
+    # 0 if ongoing, or 3 if tie
+    def result(self):
+        if self.winner:
+            return self.winner
+        if self.decided == FULL_MASK:
+            return 3
+        return 0
+
+    # list of every (b, c) the player to move can play
+    def validMoves(self):
+        if self.sentTo >= 0:
+            boards = [self.sentTo]
+        else:
+            boards = [b for b in range(9) if not self.decided & (1<<b)]
+        moves = []
+        for b in boards:
+            taken = self.local[1][b] | self.local[2][b]
+            for c in EMPTY_TABLE[taken]:
+                moves.append((b, c))
+        return moves
+
+    # player 'turn' plays square c of small board b
+    def place(self, b, c):
+        turn = self.turn
+        self.history.append((b, c, self.sentTo, self.decided, \
+                             self.meta[turn], self.winner))
+        self.local[turn][b] |= 1<<c
+        if WIN_TABLE[self.local[turn][b]]:
+            self.meta[turn] |= 1<<b
+            self.decided |= 1<<b
+            if WIN_TABLE[self.meta[turn]]:
+                self.winner = turn
+        elif FULL_TABLE[self.local[1][b] | self.local[2][b]]:
+            self.decided |= 1<<b
+        self.sentTo = -1 if self.decided & (1<<c) else c
+        self.turn = 2 if turn==1 else 1
+
+    # take back the last move
+    def unplace(self):
+        (b, c, sentTo, decided, meta, winner) = self.history.pop()
+        turn = 2 if self.turn==1 else 1
+        self.local[turn][b] ^= 1<<c
+        self.sentTo = sentTo
+        self.decided = decided
+        self.meta[turn] = meta
+        self.winner = winner
+        self.turn = turn
+
+    # piece (0, 1 or 2) on square c of small board b
+    def piece(self, b, c):
+        if self.local[1][b] & (1<<c): return 1
+        if self.local[2][b] & (1<<c): return 2
+        return 0
+
+# (x, y) on the 9x9 grid (x = column from the left, y = row from
+# the bottom, both 1-9) to (b, c), and back
+def xy_to_move(xy):
+    (x, y) = xy
+    (row, col) = (9-y, x-1)
+    return (3*(row//3) + col//3, 3*(row%3) + col%3)
+
+def move_to_xy(move):
+    (b, c) = move
+    row = 3*(b//3) + c//3
+    col = 3*(b%3) + c%3
+    return (col+1, 9-row)
+
+def xy_is_valid(xy, state):
+    (x, y) = xy
+    if not (1 <= x <= 9 and 1 <= y <= 9):
+        return False
+    return xy_to_move(xy) in state.validMoves()
+
+def gameIsDone(state):
+    return state.result()
+
+##### GUI Tools #####
+
+def drawO(row, col, size):
+    pg.draw.circle(screen, blue, (col*size + size//2, row*size + size//2), \
+        size*4//10, max(1, size*15//100))
+def drawX(row, col, size):
+    p1 = (col*size + size//4,   row*size + size//5)
+    p2 = (col*size + size*3//4, row*size + size//5)
+    p3 = (col*size + size//4,   row*size + size*4//5)
+    p4 = (col*size + size*3//4, row*size + size*4//5)
+    pg.draw.line(screen, red, p1, p4, max(1, size//5))
+    pg.draw.line(screen, red, p2, p3, max(1, size//5))
+
+def drawBoard(state):
+    screen.fill(white)
+
+    # shade the boards that can be played on
+    if not state.result():
+        for b in set(b for (b, c) in state.validMoves()):
+            pg.draw.rect(screen, yellow, ((b%3)*3*SIZE, (b//3)*3*SIZE, \
+                3*SIZE, 3*SIZE))
+
+    # draw lines, thick ones between the small boards
+    for i in range(1, 9):
+        width = SIZE//10 if i%3 == 0 else 1
+        pg.draw.line(screen, black, (i*SIZE, 0), (i*SIZE, 9*SIZE), width)
+        pg.draw.line(screen, black, (0, i*SIZE), (9*SIZE, i*SIZE), width)
+
+    # draw pieces, and a big piece over every won small board
+    for b in range(9):
+        for c in range(9):
+            row, col = 3*(b//3) + c//3, 3*(b%3) + c%3
+            piece = state.piece(b, c)
+            if piece==1:   drawO(row, col, SIZE)
+            elif piece==2: drawX(row, col, SIZE)
+        if state.meta[1] & (1<<b):   drawO(b//3, b%3, 3*SIZE)
+        elif state.meta[2] & (1<<b): drawX(b//3, b%3, 3*SIZE)
+    pg.display.flip()
+
+def printBoard(state):
+    TableTB = ("|" + "-"*11) * 3 + "|"
+    print(TableTB)
+    for row in range(9):
+        for col in range(9):
+            if col%3 == 0:
+                print("|", end='')
+            b, c = 3*(row//3) + col//3, 3*(row%3) + col%3
+            piece = state.piece(b, c)
+            symbol = " X " if piece==2 else " O " if piece==1 else "   "
+            print(symbol + (" " if col%3 != 2 else ""), end='')
+        print("|")
+        if row%3 == 2:
+            print(TableTB)
+
+##### Player 1's and 2's Strategies #####
+# turn = current turn (1 or 2)
+# state = current UltimateBoard
+# return position (x, y) of where to place piece
+
+def RandomStrat(state):
+    return move_to_xy(random.choice(state.validMoves()))
+
+# score of a 3x3 grid for the player w/ the 'own' squares against the
+# player w/ the 'opp' squares, not counting lines through 'blocked':
+# +1 for every line w/ 1 of own's pieces, +4 w/ 2 (and the same for opp,
+# but negative)
+lineScoreCache = {}
+def lineScore(own, opp, blocked=0):
+    key = (own, opp, blocked)
+    if key not in lineScoreCache:
+        score = 0
+        for line in WIN_MASKS:
+            if line & blocked:
+                continue
+            mine, theirs = own & line, opp & line
+            if mine and not theirs:
+                score += 4 if mine & (mine-1) else 1
+            elif theirs and not mine:
+                score -= 4 if theirs & (theirs-1) else 1
+        lineScoreCache[key] = score
+    return lineScoreCache[key]
+
+WIN_SCORE = 100000
+BOARD_SCORE = 30 # per small board won
+META_WEIGHT = 20 # weight of the big board's lines
+
+# score of the position for player 'turn' (the game must be ongoing)
+def evaluate(state, turn):
+    opp = 2 if turn==1 else 1
+    score = 0
+    for b in range(9):
+        if not state.decided & (1<<b):
+            score += lineScore(state.local[turn][b], state.local[opp][b])
+    tied = state.decided & ~(state.meta[1] | state.meta[2])
+    score += META_WEIGHT * lineScore(state.meta[turn], state.meta[opp], tied)
+    score += BOARD_SCORE * (bin(state.meta[turn]).count('1') - \
+                            bin(state.meta[opp]).count('1'))
+    return score
+
+# alpha-beta (negamax form: scores are always for the player to move)
+# up to depth 'depth'; return [best move, score]. Raise SearchTimeout
+# after 'deadline'
+def negamax(state, depth, alpha, beta, deadline, firstMove=None):
+    if time.perf_counter() > deadline:
+        raise SearchTimeout()
+    result = state.result()
+    if result:
+        if result == 3:
+            return [None, 0]
+        # the player who just moved won; sooner is better
+        return [None, -WIN_SCORE - depth]
+    if depth == 0:
+        return [None, evaluate(state, state.turn)]
+
+    moves = state.validMoves()
+    if firstMove in moves:
+        moves.remove(firstMove)
+        moves.insert(0, firstMove)
+    best = [moves[0], -2*WIN_SCORE]
+    for move in moves:
+        state.place(*move)
+        try:
+            [_, score] = negamax(state, depth-1, -beta, -alpha, deadline)
+        finally:
+            state.unplace()
+        score = -score
+        if score > best[1]:
+            best = [move, score]
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            break
+    return best
+
+# search deeper and deeper for 'timeLimit' seconds, and play the best
+# move of the deepest search that finished. If verbose, print how many
+# moves ahead that search looked
+def AlphaBetaStrat(timeLimit, state, verbose=False):
+    deadline = time.perf_counter() + timeLimit
+    bestMove = state.validMoves()[0]
+    searched = 0
+    for depth in range(1, 82):
+        try:
+            [move, score] = negamax(state, depth, -2*WIN_SCORE, \
+                2*WIN_SCORE, deadline, bestMove)
+        except SearchTimeout:
+            break
+        bestMove = move
+        searched = depth
+        # the game is decided; searching deeper won't help
+        if abs(score) >= WIN_SCORE:
+            break
+    if verbose:
+        print("Searched %d moves ahead" % searched)
+    return move_to_xy(bestMove)
+
+def ConsoleStrat():
+    # Console Strategy - get user input from the console/terminal
+    while(True):
+        try:
+            # You can either split by commas or by spaces (or both!)
+            taken = input().strip()
+            for char in ['(', ')']:
+                taken = taken.replace(char, '')
+            test1 = taken.split(",")
+            test2 = taken.split()
+
+            if len(test1) == 2:   taken = test1
+            elif len(test2) == 2: taken = test2
+            elif len(taken) == 2:
+                return (int(taken[0]), int(taken[1]))
+            else:
+                print("Not a valid input")
+                continue
+            return (int(taken[0].strip()), int(taken[1].strip()))
+        except ValueError:
+            print("Not a valid input")
+
+def ScreenStrat(state):
+    # Screen Strategy - click the proper square on the screen
+    while(True):
+        event = pg.event.wait()
+        if event.type == pg.QUIT:
+            exit()
+        if event.type == pg.MOUSEBUTTONDOWN:
+            mouse_x, mouse_y = event.pos
+            xy = (mouse_x//SIZE + 1, 9 - mouse_y//SIZE)
+            if xy_is_valid(xy, state):
+                return xy
+
+def HumanStrat(state, screenOn):
+    if screenOn: return ScreenStrat(state)
+    else:        return ConsoleStrat()
+
+# given the board, return a position (x, y) to place the next piece
+def Player1Strategy(state, screenOn): # CHANGE ME!
+    return HumanStrat(state, screenOn)
+    # return RandomStrat(state)
+    # return AlphaBetaStrat(1.0, state)
+    # return AlphaBetaStrat(1.0, state, verbose=True)
+
+def Player2Strategy(state, screenOn): # CHANGE ME!
+    return AlphaBetaStrat(1.0, state)
+    # return HumanStrat(state, screenOn)
+    # return RandomStrat(state)
+    # return AlphaBetaStrat(1.0, state, verbose=True)
+
+
+##### Main Function #####
+def main():
+    global screen
+
+    # Decide if you want pygame (True) or console (False)
+    screenOn = True # CHANGE ME!
+    state = UltimateBoard()
+
+    if screenOn:
+        pg.init()
+        screen = pg.display.set_mode([9*SIZE, 9*SIZE])
+
+    print("Welcome to Ultimate Tic-Tac-Toe!")
+    if screenOn: drawBoard(state)
+    else:        printBoard(state)
+    while True:
+        # Exit if X is pushed
+        if screenOn:
+            for event in pg.event.get():
+                if event.type == pg.QUIT:
+                    exit()
+
+        # Prompt for location of player's piece
+        turn = state.turn
+        print("Player %d, where will you place your piece?" % turn)
+        if turn == 1:
+            (x, y) = Player1Strategy(state, screenOn)
+        elif turn == 2:
+            (x, y) = Player2Strategy(state, screenOn)
+
+        # Check if valid location
+        if not xy_is_valid((x, y), state):
+            print("You cannot take this position. Try again.")
+            continue
+
+        # Update board, then check win condition
+        state.place(*xy_to_move((x, y)))
+        if screenOn: drawBoard(state)
+        else:        printBoard(state)
+        if gameIsDone(state):
+            break
+
+    if gameIsDone(state) == 3:
+        print("Game is a tie!")
+    else:
+        print("Player %d is the winner!" % gameIsDone(state))
+    if screenOn:
+        time.sleep(2)
+
+if __name__ == "__main__":
+    main()